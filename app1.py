@@ -7,7 +7,9 @@ import os
 import random
 import textwrap
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from string import Template
 from typing import Any, Sequence
 
 import streamlit as st
@@ -341,6 +343,45 @@ def _inject_styles() -> None:
             color: #fff8fb;
         }
 
+        .metric-row {
+            display: grid;
+            grid-template-columns: repeat(4, minmax(0, 1fr));
+            gap: 0.75rem;
+            margin: 0.2rem 0 0.4rem;
+        }
+
+        .metric-row .metric-card {
+            border-radius: 14px;
+            border: 1px solid rgba(151, 178, 241, 0.22);
+            background: rgba(8, 20, 44, 0.62);
+            padding: 0.6rem 0.75rem;
+        }
+
+        .metric-row .metric-label {
+            color: rgba(215, 230, 255, 0.8);
+            font-size: 0.84rem;
+        }
+
+        .metric-row .metric-value {
+            color: #f9fbff;
+            font-weight: 800;
+            font-size: 1.7rem;
+            letter-spacing: -0.01em;
+        }
+
+        .metric-row .metric-bar {
+            height: 4px;
+            border-radius: 999px;
+            background: rgba(128, 157, 224, 0.2);
+            overflow: hidden;
+        }
+
+        .metric-row .metric-bar span {
+            display: block;
+            height: 100%;
+            background: linear-gradient(90deg, rgba(48, 211, 190, 0.9), rgba(255, 118, 89, 0.9));
+        }
+
         .history-card {
             border-radius: 14px;
             border: 1px solid rgba(162, 187, 244, 0.22);
@@ -383,11 +424,18 @@ def _init_state() -> None:
         "ifs1_edit_output": "",
         "ifs1_history": [],
         "ifs1_status": "Ready to generate.",
+        "ifs1_status_html": "Ready to generate.",
     }
     for key, value in defaults.items():
         st.session_state.setdefault(key, value)
 
 
+def _set_status(message: str) -> None:
+    """Store the status line with its escaped form so `_top` never re-escapes it on rerun."""
+    st.session_state["ifs1_status"] = message
+    st.session_state["ifs1_status_html"] = html.escape(message)
+
+
 def _save_history(kind: str, source: str, content: str) -> None:
     item = {
         "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -562,7 +610,7 @@ def _sidebar() -> None:
         )
         if error:
             raise RuntimeError(error)
-        st.session_state["ifs1_status"] = f"API connected. Response: {content[:80]}"
+        _set_status(f"API connected. Response: {content[:80]}")
 
     st.sidebar.markdown("---")
     st.sidebar.markdown("## Project Controls")
@@ -575,35 +623,42 @@ def _sidebar() -> None:
     st.sidebar.slider("Pace", 0, 100, key="ifs1_pace")
 
 
-def _top() -> None:
-    st.markdown(
-        f"""
-        <div class="hero-card">
-          <span class="mode-pill live">OpenAI API</span>
-          <h2>Infinity Film Studio</h2>
-          <p>All generations use OpenAI directly. Missing credentials stop the app at startup.</p>
-        </div>
-        """,
-        unsafe_allow_html=True,
+_HERO_HTML = (
+    '<div class="hero-card"><span class="mode-pill live">OpenAI API</span>'
+    "<h2>Infinity Film Studio</h2>"
+    "<p>All generations use OpenAI directly. Missing credentials stop the app at startup.</p></div>"
+)
+_STATUS_TMPL = Template('<div class="status-line">Status: $status_html</div>')
+
+
+@lru_cache(maxsize=256)
+def _metrics_html(creative: int, energy: int, pace: int, balance: int) -> str:
+    """The four top metrics as one HTML block (styled by `.metric-row`)."""
+    cards = (
+        ("Creative", creative, f"{creative}"),
+        ("Energy", energy, f"{energy}%"),
+        ("Pace", pace, f"{pace}%"),
+        ("Balance", balance, f"{balance}%"),
     )
+    cells = "".join(
+        f'<div class="metric-card"><div class="metric-label">{label}</div>'
+        f'<div class="metric-value">{text}</div>'
+        f'<div class="metric-bar"><span style="width: {max(0, min(100, value))}%"></span></div></div>'
+        for label, value, text in cards
+    )
+    return f'<div class="metric-row">{cells}</div>'
+
 
+def _top() -> None:
     energy = int(st.session_state["ifs1_energy"])
     pace = int(st.session_state["ifs1_pace"])
     balance = max(0, 100 - abs(energy - pace))
     creative = min(99, int((energy * 0.55) + (pace * 0.3) + (balance * 0.15)))
 
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Creative", f"{creative}")
-    c2.metric("Energy", f"{energy}%")
-    c3.metric("Pace", f"{pace}%")
-    c4.metric("Balance", f"{balance}%")
-
     st.markdown(
-        f"""
-        <div class="status-line">
-          Status: {html.escape(st.session_state['ifs1_status'])}
-        </div>
-        """,
+        _HERO_HTML
+        + _metrics_html(creative, energy, pace, balance)
+        + _STATUS_TMPL.substitute(status_html=st.session_state["ifs1_status_html"]),
         unsafe_allow_html=True,
     )
 
@@ -656,7 +711,7 @@ def _script_tab() -> None:
             raise RuntimeError(error)
 
         st.session_state["ifs1_script_output"] = content
-        st.session_state["ifs1_status"] = "Script pack generated (live)."
+        _set_status("Script pack generated (live).")
         _save_history("Script", "live", content)
 
     if st.session_state["ifs1_script_output"]:
@@ -713,7 +768,7 @@ def _storyboard_tab() -> None:
             raise RuntimeError(error)
 
         st.session_state["ifs1_storyboard_output"] = content
-        st.session_state["ifs1_status"] = "Storyboard generated (live)."
+        _set_status("Storyboard generated (live).")
         _save_history("Storyboard", "live", content)
 
     if st.session_state["ifs1_storyboard_output"]:
@@ -768,7 +823,7 @@ def _edit_tab() -> None:
             raise RuntimeError(error)
 
         st.session_state["ifs1_edit_output"] = content
-        st.session_state["ifs1_status"] = "Edit notes generated (live)."
+        _set_status("Edit notes generated (live).")
         _save_history("Edit", "live", content)
 
     if st.session_state["ifs1_edit_output"]:
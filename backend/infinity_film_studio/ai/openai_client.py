@@ -5,15 +5,26 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
 
-try:
-    from openai import OpenAI  # type: ignore
-except ImportError:  # pragma: no cover - handled at runtime
-    OpenAI = None
+# The SDK takes a few hundred milliseconds to import, so it is loaded by `_openai_class`
+# on the first live request instead of at import time.
+OpenAI = None
 
 DEFAULT_CHAT_MODEL = "gpt-4.1-mini"
 DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
 
 
+def _openai_class() -> Any:
+    """Return the SDK's `OpenAI` class, importing it on first use; None when it is not installed."""
+    global OpenAI
+    if OpenAI is None:
+        try:
+            from openai import OpenAI as sdk_class  # type: ignore
+        except ImportError:  # pragma: no cover - handled at runtime
+            return None
+        OpenAI = sdk_class
+    return OpenAI
+
+
 @dataclass(frozen=True)
 class _Provider:
     """Provider configuration for a single OpenAI-compatible endpoint."""
@@ -56,12 +67,13 @@ class OpenAIClient:
         return stripped or None
 
     def _get_live_client(self, provider: _Provider) -> OpenAI:
-        if OpenAI is None:
-            raise RuntimeError("OpenAI SDK not installed. Run `pip install openai`.")
         client_key = (provider.api_key, provider.base_url)
         client = self._clients.get(client_key)
         if not client:
-            client = OpenAI(api_key=provider.api_key, base_url=provider.base_url)
+            sdk_class = _openai_class()
+            if sdk_class is None:
+                raise RuntimeError("OpenAI SDK not installed. Run `pip install openai`.")
+            client = sdk_class(api_key=provider.api_key, base_url=provider.base_url)
             self._clients[client_key] = client
         return client
 
@@ -69,11 +81,18 @@ class OpenAIClient:
     def client(self) -> OpenAI:
         return self._get_live_client(self._providers[0])
 
-    def chat(self, messages: list[dict[str, str]], model: str | None = None, **kwargs) -> Any:
-        """Call the OpenAI chat endpoint."""
+    def chat(
+        self,
+        messages: list[dict[str, str]],
+        model: str | None = None,
+        max_retries: int | None = None,
+        **kwargs,
+    ) -> Any:
+        """Call the OpenAI chat endpoint; `max_retries` overrides the SDK's retry count for this call."""
         provider = self._providers[0]
         chosen_model = provider.chat_model_override or model or self.default_chat_model
-        return self.client.chat.completions.create(messages=messages, model=chosen_model, **kwargs)
+        client = self.client if max_retries is None else self.client.with_options(max_retries=max_retries)
+        return client.chat.completions.create(messages=messages, model=chosen_model, **kwargs)
 
     def embeddings(self, inputs, model: str | None = None, **kwargs) -> Any:
         """Call the OpenAI embeddings endpoint."""
@@ -68,3 +68,21 @@ def test_chat_uses_primary_openai_client(monkeypatch):
 def test_client_requires_api_key():
     with pytest.raises(RuntimeError, match="Missing OpenAI API key"):
         OpenAIClient(api_key="")
+
+
+def test_chat_can_disable_sdk_retries_per_call(monkeypatch):
+    monkeypatch.setattr(openai_client_module, "OpenAI", _FakeOpenAI)
+    seen = []
+    monkeypatch.setattr(
+        _FakeOpenAI,
+        "with_options",
+        lambda self, max_retries: seen.append(max_retries) or self,
+        raising=False,
+    )
+    client = OpenAIClient(api_key="sk-openai-primary")
+
+    client.chat(messages=[{"role": "user", "content": "hello"}])
+    response = client.chat(messages=[{"role": "user", "content": "hello"}], max_retries=0)
+
+    assert response["choices"][0]["message"]["content"] == "ok"
+    assert seen == [0]
@@ -0,0 +1,350 @@
+"""Chat request helper tests for the Streamlit app."""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import gc
+from pathlib import Path
+import sys
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import streamlit as st
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import streamlit_app  # noqa: E402
+from streamlit_app import (  # noqa: E402
+    GenerationDiskCache,
+    _budget_slice,
+    _extract_content,
+    _generate_text,
+    _routed_model,
+    _session_generate,
+    _split_h2_sections,
+)
+
+
+class _SlowFirstClient:
+    """Fake client whose first call stalls until the hedged duplicate has answered."""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._released = threading.Event()
+
+    def chat(self, messages, model=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            self._released.wait(timeout=5)
+            return {"choices": [{"message": {"content": "slow"}}]}
+        self._released.set()
+        return {"choices": [{"message": {"content": "fast"}}]}
+
+
+def test_generate_text_hedges_slow_request(monkeypatch):
+    monkeypatch.setenv("IFS_HEDGE_AFTER_SECONDS", "0.05")
+    client = _SlowFirstClient()
+
+    content, status = _generate_text(client, "gpt-test", "system", "user", 0.2)
+
+    assert (content, status) == ("fast", "live")
+    assert client.calls == 2
+
+
+def test_generate_text_without_hedge_sends_one_request(monkeypatch):
+    monkeypatch.delenv("IFS_HEDGE_AFTER_SECONDS", raising=False)
+
+    class _Client:
+        calls = 0
+
+        def chat(self, messages, model=None, **kwargs):
+            self.calls += 1
+            raise ValueError("boom")
+
+    client = _Client()
+    with pytest.raises(RuntimeError, match="OpenAI request failed: boom"):
+        _generate_text(client, "gpt-test", "system", "user", 0.2)
+    assert client.calls == 1
+
+
+def test_extract_content_handles_dict_and_sdk_responses():
+    assert _extract_content({"choices": [{"message": {"content": "dict text"}}]}) == "dict text"
+
+    sdk_resp = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="sdk text"))])
+    assert _extract_content(sdk_resp) == "sdk text"
+
+    parts = [{"type": "text", "text": "part one"}, SimpleNamespace(text="part two")]
+    assert _extract_content({"choices": [{"message": {"content": parts}}]}) == "part one\npart two"
+
+    assert _extract_content({"error": "nope"}) == str({"error": "nope"})
+
+
+def test_generate_text_streams_deltas_to_callback(monkeypatch):
+    monkeypatch.delenv("IFS_HEDGE_AFTER_SECONDS", raising=False)
+
+    class _StreamingClient:
+        def chat(self, messages, model=None, **kwargs):
+            assert kwargs.get("stream") is True
+            yield {"choices": [{"delta": {"role": "assistant"}}]}
+            yield {"choices": [{"delta": {"content": "## Script"}}]}
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=" pack"))])
+
+    pieces = []
+    content, status = _generate_text(_StreamingClient(), "gpt-test", "system", "user", 0.2, pieces.append)
+
+    assert (content, status) == ("## Script pack", "live")
+    assert pieces == ["## Script", " pack"]
+
+
+def test_session_generate_serves_repeat_prompts_from_cache(monkeypatch):
+    monkeypatch.delenv("IFS_HEDGE_AFTER_SECONDS", raising=False)
+    monkeypatch.setattr(streamlit_app, "_disk_cache", lambda: None)
+    st.session_state["ifs_prompt_cache"] = OrderedDict()
+    st.session_state["ifs_cache_bypass"] = False
+    st.session_state["ifs_auto_route"] = False
+
+    class _Client:
+        calls = 0
+
+        def chat(self, messages, model=None, **kwargs):
+            self.calls += 1
+            return {"choices": [{"message": {"content": f"answer {self.calls}"}}]}
+
+    client = _Client()
+    assert _session_generate(client, "gpt-test", "system", "user", 0.2) == ("answer 1", "live")
+    assert _session_generate(client, "gpt-test", "system", "user", 0.2) == ("answer 1", "cached")
+    assert _session_generate(client, "gpt-test", "system", "user", 0.3) == ("answer 2", "live")
+    assert client.calls == 2
+
+    st.session_state["ifs_cache_bypass"] = True
+    assert _session_generate(client, "gpt-test", "system", "user", 0.2) == ("answer 3", "live")
+    assert client.calls == 3
+
+
+def test_generate_text_falls_back_on_timeout_and_trips_breaker(monkeypatch):
+    monkeypatch.delenv("IFS_HEDGE_AFTER_SECONDS", raising=False)
+
+    class _TimeoutClient:
+        def __init__(self):
+            self.models = []
+
+        def chat(self, messages, model=None, **kwargs):
+            self.models.append(model)
+            assert kwargs["timeout"] == 5.0
+            # The SDK must not retry the primary before the fallback gets its turn.
+            assert kwargs.get("max_retries") == (0 if model == "gpt-main" else None)
+            if model == "gpt-main":
+                raise TimeoutError("read timed out")
+            return {"choices": [{"message": {"content": f"from {model}"}}]}
+
+    client = _TimeoutClient()
+    breaker = streamlit_app._new_breaker()
+    guard = {"timeout": 5.0, "fallback_model": "gpt-small", "breaker": breaker}
+
+    assert _generate_text(client, "gpt-main", "system", "user", 0.2, guard=guard) == (
+        "from gpt-small",
+        "live via gpt-small",
+    )
+    assert not breaker["degraded"]
+    _generate_text(client, "gpt-main", "system", "user", 0.2, guard=guard)
+    assert breaker["degraded"]
+
+    client.models.clear()
+    _generate_text(client, "gpt-main", "system", "user", 0.2, guard=guard)
+    assert client.models == ["gpt-small"]
+
+
+def test_split_h2_sections_keeps_nested_headings():
+    reply = "Intro\n## Script Pack\n### Logline\nA heist.\n## Storyboard ##\n| Frame |\n\n## Director Deck\nShip it.\n"
+
+    sections = _split_h2_sections(reply)
+
+    assert list(sections) == ["Script Pack", "Storyboard", "Director Deck"]
+    assert sections["Script Pack"] == "### Logline\nA heist."
+    assert sections["Storyboard"] == "| Frame |"
+    assert sections["Director Deck"] == "Ship it."
+
+
+def test_budget_slice_keeps_the_head_of_every_section():
+    notes = "## Notes\n" + "trim the middle act. " * 40 + "\n## Priority\nHigh: lock the ending.\n"
+
+    assert _budget_slice("## Short\nfits", 50) == "## Short\nfits"
+
+    sliced = _budget_slice(notes, 60)
+    assert len(sliced) <= 60 * 4
+    assert sliced.startswith("## Notes\ntrim the middle act.")
+    assert sliced.endswith("## Priority\nHigh: lock the ending.")
+
+
+def test_disk_cache_survives_a_new_session(monkeypatch, tmp_path):
+    monkeypatch.delenv("IFS_HEDGE_AFTER_SECONDS", raising=False)
+    disk = GenerationDiskCache(tmp_path / "generation_cache.sqlite3")
+    monkeypatch.setattr(streamlit_app, "_disk_cache", lambda: disk)
+    st.session_state["ifs_prompt_cache"] = OrderedDict()
+    st.session_state["ifs_cache_bypass"] = False
+    st.session_state["ifs_auto_route"] = False
+
+    class _Client:
+        calls = 0
+
+        def chat(self, messages, model=None, **kwargs):
+            self.calls += 1
+            return {"choices": [{"message": {"content": "deck"}}]}
+
+    client = _Client()
+    assert _session_generate(client, "gpt-test", "system", "user", 0.2) == ("deck", "live")
+
+    st.session_state["ifs_prompt_cache"] = OrderedDict()
+    reopened = GenerationDiskCache(tmp_path / "generation_cache.sqlite3")
+    monkeypatch.setattr(streamlit_app, "_disk_cache", lambda: reopened)
+    assert _session_generate(client, "gpt-test", "system", "user", 0.2) == ("deck", "cached")
+    assert client.calls == 1
+
+    other_endpoint = _Client()
+    other_endpoint._providers = [SimpleNamespace(api_key="local", base_url="http://localhost:11434/v1")]
+    assert _session_generate(other_endpoint, "gpt-test", "system", "user", 0.2) == ("deck", "live")
+
+    assert reopened.clear() == 2
+    assert reopened.get("anything") is None
+
+    reopened._conn.close()
+    assert reopened.clear() == 0
+
+
+def test_clear_shared_cache_only_reports_what_it_cleared(monkeypatch, tmp_path):
+    disk = GenerationDiskCache(tmp_path / "generation_cache.sqlite3")
+    disk.put("key", "deck", "live")
+    monkeypatch.setattr(streamlit_app, "_disk_cache", lambda: disk)
+
+    monkeypatch.delenv("IFS_ALLOW_SHARED_CACHE_CLEAR", raising=False)
+    streamlit_app._clear_shared_cache()
+    assert disk.get("key") == ("deck", "live")
+    assert st.session_state["ifs_status_line"].startswith("Session generation cache cleared")
+
+    monkeypatch.setenv("IFS_ALLOW_SHARED_CACHE_CLEAR", "1")
+    streamlit_app._clear_shared_cache()
+    assert disk.get("key") is None
+    assert st.session_state["ifs_status_line"] == "Shared generation cache cleared (1 saved responses removed)."
+
+
+def test_routed_model_sends_only_short_prompts_to_light_model():
+    guard = {"light_model": "gpt-light"}
+
+    assert _routed_model("gpt-main", "Output:\n- Prioritized numbered edit notes", guard) == "gpt-light"
+    assert _routed_model("gpt-main", "Produce:\n3) Scene excerpt (~180 words)", guard) == "gpt-main"
+    assert _routed_model("gpt-main", "x" * 600, guard) == "gpt-main"
+    assert _routed_model("gpt-main", "short", {"light_model": ""}) == "gpt-main"
+
+
+def test_light_model_is_opt_in_and_never_overrides_a_chosen_model(monkeypatch):
+    monkeypatch.setattr(streamlit_app, "LIGHT_CHAT_MODEL", "gpt-light")
+    st.session_state["ifs_model"] = streamlit_app.DEFAULT_CHAT_MODEL
+    st.session_state["ifs_auto_route"] = False
+    assert streamlit_app._light_model_for_session() == ""
+
+    st.session_state["ifs_auto_route"] = True
+    assert streamlit_app._light_model_for_session() == "gpt-light"
+
+    st.session_state["ifs_model"] = "my-local-model"
+    assert streamlit_app._light_model_for_session() == ""
+
+    monkeypatch.setattr(streamlit_app, "LIGHT_CHAT_MODEL", "")
+    st.session_state["ifs_model"] = streamlit_app.DEFAULT_CHAT_MODEL
+    assert streamlit_app._light_model_for_session() == ""
+
+
+def test_disk_cache_expires_and_caps_rows(monkeypatch, tmp_path):
+    disk = GenerationDiskCache(tmp_path / "generation_cache.sqlite3", max_rows=2, ttl_seconds=60)
+    now = [1000.0]
+    monkeypatch.setattr(streamlit_app.time, "time", lambda: now[0])
+
+    for key in ("a", "b", "c"):
+        disk.put(key, f"content {key}", "live")
+        now[0] += 1
+    assert disk.get("a") is None
+    assert disk.get("c") == ("content c", "live")
+
+    now[0] += 60
+    assert disk.get("c") is None
+
+
+def test_cache_dir_stays_outside_the_repo(monkeypatch, tmp_path):
+    monkeypatch.setenv("IFS_CACHE_DIR", str(tmp_path / "cache"))
+    assert streamlit_app._cache_dir() == tmp_path / "cache"
+
+    monkeypatch.delenv("IFS_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert streamlit_app._cache_dir() == tmp_path / "infinity-film-studio"
+
+
+def test_token_encoding_returns_none_when_tiktoken_is_unusable(monkeypatch):
+    def _unknown_model(model):
+        raise KeyError(model)
+
+    def _offline(name):
+        raise OSError("cannot download BPE file")
+
+    broken = SimpleNamespace(encoding_for_model=_unknown_model, get_encoding=_offline)
+    monkeypatch.setitem(sys.modules, "tiktoken", broken)
+    streamlit_app._token_encoding.cache_clear()
+    assert streamlit_app._token_encoding("custom-model") is None
+
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    streamlit_app._token_encoding.cache_clear()
+    assert streamlit_app._token_encoding("gpt-4.1-mini") is None
+    streamlit_app._token_encoding.cache_clear()
+
+
+def test_generate_all_keeps_finished_parts_when_one_fails(monkeypatch):
+    monkeypatch.delenv("IFS_HEDGE_AFTER_SECONDS", raising=False)
+    monkeypatch.setattr(streamlit_app, "_disk_cache", lambda: None)
+    monkeypatch.setattr(streamlit_app, "_save_history", lambda *args: None)
+    monkeypatch.setattr(streamlit_app.st, "status", MagicMock())
+    streamlit_app._init_state()
+    st.session_state["ifs_prompt_cache"] = OrderedDict()
+    for key in ("ifs_script_output", "ifs_storyboard_output", "ifs_edit_output", "ifs_deck_output"):
+        st.session_state[key] = ""
+
+    class _Client:
+        def chat(self, messages, model=None, **kwargs):
+            if messages[0]["content"] == streamlit_app._STORY_SYS:
+                raise ValueError("storyboard down")
+            return {"choices": [{"message": {"content": "ok"}}]}
+
+    streamlit_app._generate_all(_Client())
+
+    assert st.session_state["ifs_script_output"] == "ok"
+    assert st.session_state["ifs_edit_output"] == "ok"
+    assert st.session_state["ifs_storyboard_output"] == ""
+    assert st.session_state["ifs_deck_output"] == ""
+    assert "Storyboard (OpenAI request failed: storyboard down)" in st.session_state["ifs_status_line"]
+
+
+def test_script_poller_reports_a_failed_generation(monkeypatch):
+    monkeypatch.setattr(streamlit_app, "_rerun", lambda: None)
+    future = Future()
+    future.set_exception(RuntimeError("OpenAI request failed: slow"))
+    st.session_state["ifs_pending_script"] = {"future": future, "project": "P", "chunks": [], "cache_key": "k"}
+
+    poller = streamlit_app._script_pending_poller
+    getattr(poller, "__wrapped__", poller)()  # the fragment wrapper does not run outside a script run
+
+    assert st.session_state.get("ifs_pending_script") is None
+    assert st.session_state["ifs_status_line"] == "Script pack generation failed (OpenAI request failed: slow)."
+
+
+def test_session_pool_shuts_down_when_session_drops_it():
+    st.session_state.pop("ifs_generation_pool", None)
+    executor = streamlit_app._generation_executor()
+    assert streamlit_app._generation_executor() is executor
+
+    del st.session_state["ifs_generation_pool"]
+    gc.collect()
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
@@ -1,17 +1,30 @@
 """Rough-cut analysis helper tests for the Streamlit app."""
 
+import gc
+import io
+import json
 from pathlib import Path
 import sys
 
+import streamlit as st
+
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from streamlit_app import (
+    RoughCutRow,
     _build_cut_segments,
     _fallback_rough_cut_rows,
+    _probe_video_metadata,
+    _rough_cut_csv_export,
+    _rough_cut_json_export,
+    _rough_cut_rows_key,
     _rough_cut_rows_summary,
     _rough_cut_rows_to_csv,
+    _spool_upload,
+    _spooled_upload,
+    _upload_cache_id,
 )
 
 
@@ -39,12 +52,52 @@ def test_rough_cut_rows_and_exports():
     )
 
     assert rows
-    assert rows[0]["timestamp"].count(":") >= 1
-    assert {"priority", "issue", "action"}.issubset(rows[0].keys())
+    assert isinstance(rows[0], RoughCutRow)
+    assert rows[0].timestamp.count(":") >= 1
+    assert {"priority", "issue", "action"}.issubset(rows[0]._fields)
 
     csv_text = _rough_cut_rows_to_csv(rows)
     assert "timestamp,priority,focus,issue,observation,action,confidence" in csv_text
+    assert _rough_cut_rows_to_csv([row._asdict() for row in rows]) == csv_text
+
+    rows_key = _rough_cut_rows_key(rows)
+    assert _rough_cut_csv_export(rows_key) == csv_text
+    assert json.loads(_rough_cut_json_export(rows_key)) == [row._asdict() for row in rows]
 
     summary = _rough_cut_rows_summary(rows)
     assert "Priorities ->" in summary
     assert "Top issue clusters ->" in summary
+
+
+def test_spool_upload_copies_to_temp_path_for_probing():
+    upload = io.BytesIO(b"not really a video" * 64)
+    upload.name = "cut_v2.mov"
+
+    path, size = _spool_upload(upload)
+    try:
+        assert path.endswith(".mov")
+        assert size == len(upload.getvalue())
+        assert Path(path).read_bytes() == upload.getvalue()
+        # Plain BytesIO has no Streamlit file_id, so the id falls back to a content fingerprint.
+        assert len(_upload_cache_id(upload)) == 32
+        upload.file_id = "upload-1"
+        assert _upload_cache_id(upload) == "upload-1"
+
+        meta = _probe_video_metadata("cut_v2.mov", path)
+        assert meta["file_size_bytes"] == size
+        assert meta["probe_status"] in {"ok", "ffprobe_failed", "ffprobe_not_installed"}
+    finally:
+        Path(path).unlink(missing_ok=True)
+
+
+def test_upload_spool_is_deleted_when_session_state_drops_it():
+    upload = io.BytesIO(b"frame" * 256)
+    upload.name = "cut_v3.mp4"
+    upload.file_id = "upload-2"
+
+    path = Path(_spooled_upload(upload)["path"])
+    assert path.is_file()
+
+    del st.session_state["ifs_rough_cut_spool"]
+    gc.collect()
+    assert not path.exists()
@@ -2,22 +2,38 @@
 
 from __future__ import annotations
 
+import atexit
 import html
 import csv
 import difflib
+import hashlib
 import io
 import json
 import os
 import random
 import re
+import shutil
+import sqlite3
 import subprocess
 import sys
 import tempfile
 import textwrap
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, Sequence
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple, Sequence
 
+import pandas as pd
 import streamlit as st
 
 try:  # pragma: no cover - optional dependency at runtime
@@ -25,6 +41,11 @@ try:  # pragma: no cover - optional dependency at runtime
 except ImportError:  # pragma: no cover
     load_dotenv = None
 
+try:  # pragma: no cover - optional dependency at runtime
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 # Ensure backend package is importable when running `streamlit run streamlit_app.py`.
 ROOT = Path(__file__).resolve().parent
 BACKEND_ROOT = ROOT / "backend"
@@ -88,149 +109,186 @@ def _hydrate_env_from_streamlit_secrets() -> None:
 
 _hydrate_env_from_streamlit_secrets()
 
-from infinity_film_studio.app import create_app  # noqa: E402
-
-GENRES = ["Sci-Fi", "Thriller", "Drama", "Mystery", "Action", "Comedy"]
-TONES = ["Hopeful", "Dark", "Bittersweet", "Urgent", "Whimsical"]
-CAMERA_STYLES = [
+GENRES = ("Sci-Fi", "Thriller", "Drama", "Mystery", "Action", "Comedy")
+TONES = ("Hopeful", "Dark", "Bittersweet", "Urgent", "Whimsical")
+CAMERA_STYLES = (
     "Handheld energy",
     "Steady cinematic",
     "Slow dolly",
     "Wide tableau",
     "Tight intimate closeups",
-]
-PALETTES = [
+)
+PALETTES = (
     "Neon cyan + amber",
     "Muted earth + steel",
     "Cold blue + white",
     "Warm tungsten + shadow",
     "High contrast monochrome",
-]
-ISSUE_FLAGS = [
+)
+PACING_PROFILES = ("Fast", "Balanced", "Slow burn")
+
+ISSUE_FLAGS = (
     "Dialogue muddy",
     "Too slow in middle",
     "Looks flat",
     "Confusing geography",
     "Weak ending impact",
-]
-FOCUS_AREAS = [
+)
+FOCUS_AREAS = (
     "Character emotion",
     "World-building",
     "Action choreography",
     "Mystery tension",
     "Dialogue rhythm",
-]
-CONCEPT_SEEDS = [
+)
+_FOCUS_INDEX = {value: index for index, value in enumerate(FOCUS_AREAS)}
+CONCEPT_SEEDS = (
     "A rescue pilot returns to a city that no longer remembers her.",
     "An aging stunt coordinator trains a teenage genius in secret.",
     "A floating market hides a blackmail ring run by retired actors.",
     "Three siblings race one night to recover a missing reel of film.",
     "A climate lab intern discovers weather can be scored like music.",
-]
-STYLE_PRESETS = [
-    {
-        "name": "Neon Pursuit",
-        "genre": "Sci-Fi",
-        "tone": "Urgent",
-        "camera_style": "Steady cinematic",
-        "palette": "Neon cyan + amber",
-        "energy": 74,
-        "pace": 66,
-        "focus": "Action choreography",
-        "tagline": "Electric city tension with precision camera language.",
-    },
-    {
-        "name": "Quiet Fracture",
-        "genre": "Drama",
-        "tone": "Bittersweet",
-        "camera_style": "Tight intimate closeups",
-        "palette": "Muted earth + steel",
-        "energy": 52,
-        "pace": 41,
-        "focus": "Character emotion",
-        "tagline": "Controlled emotion and close-frame vulnerability.",
-    },
-    {
-        "name": "Stormline Protocol",
-        "genre": "Thriller",
-        "tone": "Dark",
-        "camera_style": "Handheld energy",
-        "palette": "Cold blue + white",
-        "energy": 81,
-        "pace": 72,
-        "focus": "Mystery tension",
-        "tagline": "High-pressure movement with escalating uncertainty.",
-    },
-    {
-        "name": "Golden Rebuild",
-        "genre": "Action",
-        "tone": "Hopeful",
-        "camera_style": "Slow dolly",
-        "palette": "Warm tungsten + shadow",
-        "energy": 67,
-        "pace": 58,
-        "focus": "World-building",
-        "tagline": "Forward momentum with warm cinematic lift.",
-    },
-]
+)
+STYLE_PRESETS: tuple[Mapping[str, Any], ...] = tuple(
+    MappingProxyType(preset)
+    for preset in (
+        {
+            "name": "Neon Pursuit",
+            "genre": "Sci-Fi",
+            "tone": "Urgent",
+            "camera_style": "Steady cinematic",
+            "palette": "Neon cyan + amber",
+            "energy": 74,
+            "pace": 66,
+            "focus": "Action choreography",
+            "tagline": "Electric city tension with precision camera language.",
+        },
+        {
+            "name": "Quiet Fracture",
+            "genre": "Drama",
+            "tone": "Bittersweet",
+            "camera_style": "Tight intimate closeups",
+            "palette": "Muted earth + steel",
+            "energy": 52,
+            "pace": 41,
+            "focus": "Character emotion",
+            "tagline": "Controlled emotion and close-frame vulnerability.",
+        },
+        {
+            "name": "Stormline Protocol",
+            "genre": "Thriller",
+            "tone": "Dark",
+            "camera_style": "Handheld energy",
+            "palette": "Cold blue + white",
+            "energy": 81,
+            "pace": 72,
+            "focus": "Mystery tension",
+            "tagline": "High-pressure movement with escalating uncertainty.",
+        },
+        {
+            "name": "Golden Rebuild",
+            "genre": "Action",
+            "tone": "Hopeful",
+            "camera_style": "Slow dolly",
+            "palette": "Warm tungsten + shadow",
+            "energy": 67,
+            "pace": 58,
+            "focus": "World-building",
+            "tagline": "Forward momentum with warm cinematic lift.",
+        },
+    )
+)
+_PRESETS_BY_NAME: dict[str, Mapping[str, Any]] = {preset["name"]: preset for preset in STYLE_PRESETS}
+
+HISTORY_LIMIT = 14
+PROMPT_CACHE_LIMIT = 64
+# Bounds for the on-disk response cache shared by all sessions (see `GenerationDiskCache`).
+DISK_CACHE_MAX_ROWS = 500
+DISK_CACHE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 30
+# Consecutive timed-out requests before the session skips straight to the fallback model.
+BREAKER_TIMEOUT_LIMIT = 2
+# Background generations one session may run at once (Generate All fans out to three).
+GENERATION_WORKERS_PER_SESSION = 3
 
 DEFAULT_CHAT_MODEL = os.getenv(
     "OPENAI_DEFAULT_CHAT_MODEL",
     "gpt-4.1-mini",
 )
+# Optional cheaper tier for short prompts (see `_routed_model`); routing is only offered when
+# `IFS_LIGHT_MODEL` names a model the configured endpoint serves.
+LIGHT_CHAT_MODEL = os.getenv("IFS_LIGHT_MODEL", "").strip()
+LIGHT_PROMPT_MAX_CHARS = 600
 
 
-@st.cache_resource
 def _get_ai_client() -> Any:
-    app = create_app()
-    return app["ai_client"]
+    """Return this session's AI client, building it on first use.
 
+    Kept in session state rather than `st.cache_resource` so sessions never share one client object.
+    """
+    client = st.session_state.get("ifs_ai_client")
+    if client is None:
+        # Imported here so the backend (and the OpenAI SDK behind it) loads on first use, not at page import.
+        from infinity_film_studio.app import create_app
 
-def _extract_content(resp: Any) -> str:
-    """Handle both demo dict responses and SDK objects."""
-    def _normalize(content: Any) -> str:
-        if content is None:
-            return ""
-        if isinstance(content, str):
-            return content
-        if isinstance(content, list):
-            parts: list[str] = []
-            for item in content:
-                if isinstance(item, dict):
-                    text_value = item.get("text") or item.get("content")
-                    if isinstance(text_value, str):
-                        parts.append(text_value)
-                else:
-                    text_value = getattr(item, "text", None) or getattr(item, "content", None)
-                    if isinstance(text_value, str):
-                        parts.append(text_value)
-            if parts:
-                return "\n".join(parts).strip()
-        return str(content)
+        client = create_app()["ai_client"]
+        st.session_state["ifs_ai_client"] = client
+        st.session_state["ifs_provider_chain"] = _provider_chain_text(client)
+    return client
 
-    try:
-        return _normalize(resp["choices"][0]["message"]["content"])
-    except Exception:
-        pass
 
-    try:
-        return _normalize(resp.choices[0].message.content)  # type: ignore[attr-defined]
-    except Exception:
-        pass
+def _normalize_content(content: Any) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts: list[str] = []
+        for item in content:
+            if isinstance(item, dict):
+                text_value = item.get("text") or item.get("content")
+            else:
+                text_value = getattr(item, "text", None) or getattr(item, "content", None)
+            if isinstance(text_value, str):
+                parts.append(text_value)
+        if parts:
+            return "\n".join(parts).strip()
+    return str(content)
 
-    try:
-        message = resp.choices[0].message  # type: ignore[attr-defined]
-        if isinstance(message, dict):
-            return _normalize(message.get("content", ""))
-    except Exception:
-        pass
 
-    return str(resp)
+def _extract_content(resp: Any) -> str:
+    """Handle both demo dict responses and SDK objects.
+
+    Dispatches on the response shape once instead of probing with try/except.
+    """
+    choices = resp.get("choices") if isinstance(resp, dict) else getattr(resp, "choices", None)
+    if not choices:
+        return str(resp)
+    choice = choices[0]
+    message = choice.get("message") if isinstance(choice, dict) else getattr(choice, "message", None)
+    if message is None:
+        return str(resp)
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+    return _normalize_content(content)
+
+
+def _extract_delta(chunk: Any) -> str:
+    """Text carried by one streamed chat chunk (dict or SDK object); empty for role/finish chunks."""
+    choices = chunk.get("choices") if isinstance(chunk, dict) else getattr(chunk, "choices", None)
+    if not choices:
+        return ""
+    choice = choices[0]
+    delta = choice.get("delta") if isinstance(choice, dict) else getattr(choice, "delta", None)
+    if delta is None:
+        return ""
+    content = delta.get("content") if isinstance(delta, dict) else getattr(delta, "content", None)
+    return content if isinstance(content, str) else ""
 
 
 def _seed_for(*parts: str) -> int:
+    """Cheap non-cryptographic seed for the deterministic fallback generators."""
     key = "|".join(parts).strip().lower()
-    return abs(hash(key)) % (2**31)
+    return zlib.crc32(key.encode("utf-8")) & 0xFFFFFFFF
 
 
 WORKSPACE_SETTINGS_KEYS = (
@@ -264,8 +322,6 @@ WORKSPACE_OUTPUT_KEYS = (
     "ifs_rough_cut_output",
     "ifs_deck_output",
     "ifs_rough_cut_timeline_rows",
-    "ifs_rough_cut_timeline_csv",
-    "ifs_rough_cut_timeline_json",
     "ifs_rough_cut_metadata",
 )
 
@@ -298,6 +354,15 @@ def _provider_chain_text(ai_client: Any) -> str:
     return " -> ".join(names)
 
 
+def _client_endpoint(ai_client: Any) -> str:
+    """Provider name and base URL of each configured provider, so cached responses stay per endpoint."""
+    providers = getattr(ai_client, "_providers", None) or []
+    return " -> ".join(
+        f"{_provider_name(getattr(p, 'api_key', None), getattr(p, 'base_url', None))}@{getattr(p, 'base_url', None) or ''}"
+        for p in providers
+    )
+
+
 def _rerun() -> None:
     try:
         st.rerun()
@@ -305,6 +370,21 @@ def _rerun() -> None:
         st.experimental_rerun()
 
 
+_FRAGMENT_DECORATOR = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def _fragment(func: Callable[..., None] | None = None, *, run_every: float | None = None) -> Any:
+    """Run `func` as a fragment so its widgets only rerun that tab (no-op on Streamlit without fragments).
+
+    With `run_every`, the fragment also reruns itself on that interval while it is on the page.
+    """
+    if func is None:
+        return lambda inner: _fragment(inner, run_every=run_every)
+    if _FRAGMENT_DECORATOR is None:
+        return func
+    return _FRAGMENT_DECORATOR(func, run_every=run_every) if run_every else _FRAGMENT_DECORATOR(func)
+
+
 def _init_state() -> None:
     defaults = {
         "ifs_project_title": "Neon Corridor",
@@ -323,6 +403,9 @@ def _init_state() -> None:
         "ifs_story_prompt": "The protagonist commits to the plan while alarms start rising.",
         "ifs_story_prompt_origin": "manual",
         "ifs_edit_objective": "narrative clarity and emotional punch",
+        "ifs_edit_pacing": PACING_PROFILES[1],
+        "ifs_edit_runtime_target": 12,
+        "ifs_edit_issues": ["Too slow in middle"],
         "ifs_rough_cut_notes": "",
         "ifs_rough_cut_question": "Where does pacing drop and what should I cut first?",
         "ifs_clip_duration_guess_seconds": 90,
@@ -332,11 +415,10 @@ def _init_state() -> None:
         "ifs_edit_output": "",
         "ifs_rough_cut_output": "",
         "ifs_rough_cut_timeline_rows": [],
-        "ifs_rough_cut_timeline_csv": "",
-        "ifs_rough_cut_timeline_json": "",
         "ifs_rough_cut_metadata": {},
+        "ifs_rough_cut_timeline_df": None,
         "ifs_deck_output": "",
-        "ifs_history": [],
+        "ifs_history": deque(maxlen=HISTORY_LIMIT),
         "ifs_preset": STYLE_PRESETS[0]["name"],
         "ifs_workspace_name": "Neon Corridor",
         "ifs_workspace_version_note": "",
@@ -346,64 +428,105 @@ def _init_state() -> None:
         "ifs_workspace_compare_field": "Director Deck",
         "ifs_workspace_export_source": "Current session",
         "ifs_status_line": "Ready.",
+        "ifs_prompt_cache": OrderedDict(),
+        "ifs_cache_bypass": False,
+        "ifs_timeout": DEFAULT_REQUEST_TIMEOUT_SECONDS,
+        "ifs_fallback_model": "",
+        "ifs_generate_all_combined": False,
+        "ifs_auto_route": False,
     }
     for key, value in defaults.items():
         st.session_state.setdefault(key, value)
 
 
-def _inject_styles() -> None:
-    st.markdown(
-        """
-        <style>
-        .block-container {
-            max-width: 1040px;
-            padding-top: 1rem;
-            padding-bottom: 2rem;
-        }
+def _compact_css(css: str) -> str:
+    """Collapse whitespace in a static stylesheet; runs once at import."""
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", css).replace(": ", ":").strip()
 
-        .stButton > button {
-            border-radius: 8px;
-        }
 
-        .export-row {
-            border-top: 1px solid rgba(128, 128, 128, 0.22);
-            margin-top: 0.55rem;
-            padding-top: 0.55rem;
-        }
+_APP_STYLES = _compact_css(
+    """\
+<style>
+.block-container {
+    max-width: 1040px;
+    padding-top: 1rem;
+    padding-bottom: 2rem;
+}
 
-        .history-item {
-            border-radius: 10px;
-            border: 1px solid rgba(128, 128, 128, 0.22);
-            background: rgba(127, 127, 127, 0.05);
-            padding: 0.76rem 0.88rem;
-            margin-bottom: 0.6rem;
-        }
+.stButton > button {
+    border-radius: 8px;
+}
 
-        .history-item h5 {
-            margin: 0;
-            font-size: 0.95rem;
-        }
+.export-row {
+    border-top: 1px solid rgba(128, 128, 128, 0.22);
+    margin-top: 0.55rem;
+    padding-top: 0.55rem;
+}
 
-        .history-item p {
-            margin: 0.3rem 0 0;
-            font-size: 0.84rem;
-        }
+.history-item {
+    border-radius: 10px;
+    border: 1px solid rgba(128, 128, 128, 0.22);
+    background: rgba(127, 127, 127, 0.05);
+    padding: 0.76rem 0.88rem;
+    margin-bottom: 0.6rem;
+}
 
-        .mini-label {
-            font-size: 0.82rem;
-            margin-bottom: 0.12rem;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+.history-item h5 {
+    margin: 0;
+    font-size: 0.95rem;
+}
+
+.history-item p {
+    margin: 0.3rem 0 0;
+    font-size: 0.84rem;
+}
+
+.metric-grid {
+    display: grid;
+    grid-template-columns: repeat(4, minmax(0, 1fr));
+    gap: 0.75rem;
+    margin: 0.4rem 0 0.8rem;
+}
+
+.metric-grid h6 {
+    margin: 0;
+    padding: 0;
+    font-size: 0.82rem;
+    font-weight: 400;
+    opacity: 0.75;
+}
+
+.metric-grid p {
+    margin: 0.15rem 0 0;
+    font-size: 1.6rem;
+    line-height: 1.2;
+}
+
+.mini-label {
+    font-size: 0.82rem;
+    margin-bottom: 0.12rem;
+}
+</style>
+"""
+)
+
+
+def _metric_grid_html(pairs: Sequence[tuple[str, str]]) -> str:
+    """One HTML block for a row of label/value metrics (styled by `.metric-grid`)."""
+    cells = "".join(f"<div><h6>{html.escape(label)}</h6><p>{html.escape(value)}</p></div>" for label, value in pairs)
+    return f"<div class='metric-grid'>{cells}</div>"
+
+
+def _inject_styles() -> None:
+    # Emitted on every full run on purpose: Streamlit drops any element a rerun does not
+    # re-emit, so an "already injected" guard would strip the styles after the first click.
+    # Tab interactions run as fragments and never reach this call.
+    st.markdown(_APP_STYLES, unsafe_allow_html=True)
 
 
-def _preset_by_name(name: str) -> dict[str, Any]:
-    for preset in STYLE_PRESETS:
-        if preset["name"] == name:
-            return preset
-    return STYLE_PRESETS[0]
+def _preset_by_name(name: str) -> Mapping[str, Any]:
+    return _PRESETS_BY_NAME.get(name, STYLE_PRESETS[0])
 
 
 def _apply_preset(name: str) -> None:
@@ -418,8 +541,11 @@ def _apply_preset(name: str) -> None:
     st.session_state["ifs_status_line"] = f"Applied preset: {preset['name']}"
 
 
+_RNG = random.Random()
+
+
 def _randomize_profile() -> None:
-    rng = random.Random()
+    rng = _RNG
     st.session_state["ifs_genre"] = rng.choice(GENRES)
     st.session_state["ifs_tone"] = rng.choice(TONES)
     st.session_state["ifs_camera_style"] = rng.choice(CAMERA_STYLES)
@@ -430,6 +556,20 @@ def _randomize_profile() -> None:
     st.session_state["ifs_status_line"] = "Profile randomized for a fresh direction."
 
 
+def _apply_selected_preset() -> None:
+    _apply_preset(st.session_state["ifs_preset"])
+
+
+def _shuffle_concept() -> None:
+    st.session_state["ifs_concept_idx"] = (st.session_state["ifs_concept_idx"] + 1) % len(CONCEPT_SEEDS)
+    st.session_state["ifs_status_line"] = "Concept changed. Load it into Script if you want to use it."
+
+
+def _use_concept_everywhere(concept: str) -> None:
+    st.session_state["ifs_script_prompt"] = concept
+    _set_story_prompt(concept, "concept", "Active concept copied into script and storyboard.")
+
+
 def _set_state_value(key: str, value: Any, status_line: str | None = None) -> None:
     st.session_state[key] = value
     if status_line is not None:
@@ -493,32 +633,84 @@ def _rotate_value(values: Sequence[str], current: str) -> str:
     return values[(idx + 1) % len(values)]
 
 
+_HISTORY_HTML_KEYS = ("kind_html", "title_html", "time_html", "preview_html")
+_HISTORY_CARD_TMPL = (
+    '<div class="history-item"><h5>[{kind_html}] {title_html}</h5>'
+    "<p>{time_html}</p><p>{preview_html}...</p></div>"
+)
+
+
+def _escape_history_item(item: dict[str, Any]) -> dict[str, Any]:
+    """Attach the escaped card fields once so `_history_tab` never re-escapes on rerun."""
+    preview = str(item.get("content", ""))[:280].replace("\n", " ").strip()
+    item["kind_html"] = html.escape(str(item.get("kind", "")))
+    item["title_html"] = html.escape(str(item.get("title", "")))
+    item["time_html"] = html.escape(str(item.get("time", "")))
+    item["preview_html"] = html.escape(preview)
+    return item
+
+
 def _save_history(kind: str, title: str, content: str) -> None:
     item = {
+        "id": uuid.uuid4().hex,
         "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "kind": kind,
         "title": title,
         "content": content,
     }
     history = st.session_state["ifs_history"]
-    history.insert(0, item)
-    del history[14:]
+    if not isinstance(history, deque):
+        history = st.session_state["ifs_history"] = deque(history, maxlen=HISTORY_LIMIT)
+    history.appendleft(_escape_history_item(item))
 
 
-def _build_director_brief() -> str:
-    concept = CONCEPT_SEEDS[st.session_state["ifs_concept_idx"]]
+def _remove_history_item(item_id: str) -> None:
+    history = st.session_state["ifs_history"]
+    for item in history:
+        if item.get("id") == item_id:
+            history.remove(item)
+            st.session_state["ifs_status_line"] = "History item removed."
+            return
+
+
+@lru_cache(maxsize=64)
+def _director_brief_text(
+    title: str,
+    concept: str,
+    tone: str,
+    genre: str,
+    camera_style: str,
+    palette: str,
+    focus: str,
+    energy: int,
+    pace: int,
+) -> str:
     return (
-        f"Project '{st.session_state['ifs_project_title']}' follows this premise: {concept} "
-        f"The style profile is {st.session_state['ifs_tone'].lower()} {st.session_state['ifs_genre'].lower()} "
-        f"with {st.session_state['ifs_camera_style'].lower()} framing and {st.session_state['ifs_palette'].lower()} palette. "
-        f"Focus area is {st.session_state['ifs_focus'].lower()}, with energy {st.session_state['ifs_energy']}/100 "
-        f"and pace {st.session_state['ifs_pace']}/100."
+        f"Project '{title}' follows this premise: {concept} "
+        f"The style profile is {tone.lower()} {genre.lower()} "
+        f"with {camera_style.lower()} framing and {palette.lower()} palette. "
+        f"Focus area is {focus.lower()}, with energy {energy}/100 "
+        f"and pace {pace}/100."
     )
 
 
-def _compute_scores() -> dict[str, int]:
-    energy = int(st.session_state["ifs_energy"])
-    pace = int(st.session_state["ifs_pace"])
+def _build_director_brief() -> str:
+    ss = st.session_state
+    return _director_brief_text(
+        ss["ifs_project_title"],
+        CONCEPT_SEEDS[ss["ifs_concept_idx"]],
+        ss["ifs_tone"],
+        ss["ifs_genre"],
+        ss["ifs_camera_style"],
+        ss["ifs_palette"],
+        ss["ifs_focus"],
+        ss["ifs_energy"],
+        ss["ifs_pace"],
+    )
+
+
+@lru_cache(maxsize=128)
+def _score_profile(energy: int, pace: int) -> tuple[tuple[str, int], ...]:
     balance = max(0, 100 - abs(energy - pace))
 
     creative_score = min(99, int(energy * 0.52 + pace * 0.31 + balance * 0.17))
@@ -527,13 +719,18 @@ def _compute_scores() -> dict[str, int]:
     visual = min(99, int(energy * 0.35 + 45))
     cohesion = min(99, int(balance * 0.72 + 22))
 
-    return {
-        "creative": creative_score,
-        "tension": tension,
-        "clarity": clarity,
-        "visual": visual,
-        "cohesion": cohesion,
-    }
+    return (
+        ("creative", creative_score),
+        ("tension", tension),
+        ("clarity", clarity),
+        ("visual", visual),
+        ("cohesion", cohesion),
+        ("balance", balance),
+    )
+
+
+def _compute_scores() -> dict[str, int]:
+    return dict(_score_profile(int(st.session_state["ifs_energy"]), int(st.session_state["ifs_pace"])))
 
 
 def _progress(label: str, value: int) -> None:
@@ -596,12 +793,14 @@ def _parse_rate(rate: str | None) -> float | None:
     return _safe_float(text)
 
 
-@st.cache_data(show_spinner=False)
-def _probe_video_metadata(file_name: str, video_bytes: bytes) -> dict[str, Any]:
-    """Best-effort ffprobe metadata extraction for rough-cut uploads."""
-    meta: dict[str, Any] = {
+_VIDEO_MIME_PREFIXES = ("video/",)
+_VIDEO_EXTS = frozenset({".mp4", ".mov", ".m4v", ".webm", ".mkv", ".avi"})
+
+
+def _empty_clip_metadata(file_name: str, file_size: int, probe_status: str) -> dict[str, Any]:
+    return {
         "file_name": file_name or "rough-cut",
-        "file_size_bytes": len(video_bytes or b""),
+        "file_size_bytes": file_size,
         "duration_seconds": None,
         "width": None,
         "height": None,
@@ -609,18 +808,24 @@ def _probe_video_metadata(file_name: str, video_bytes: bytes) -> dict[str, Any]:
         "video_codec": None,
         "audio_codec": None,
         "bitrate_kbps": None,
-        "probe_status": "unavailable",
+        "probe_status": probe_status,
     }
-    if not video_bytes:
+
+
+def _is_probeable_video(file_name: str, mime_type: str) -> bool:
+    """Only spawn ffprobe for uploads that look like video by MIME type or extension."""
+    return (mime_type or "").startswith(_VIDEO_MIME_PREFIXES) or Path(file_name or "").suffix.lower() in _VIDEO_EXTS
+
+
+def _probe_video_metadata(file_name: str, video_path: str | Path) -> dict[str, Any]:
+    """Best-effort ffprobe metadata extraction for a spooled rough-cut upload."""
+    path = Path(video_path) if video_path else None
+    file_size = path.stat().st_size if path is not None and path.is_file() else 0
+    meta = _empty_clip_metadata(file_name, file_size, "unavailable")
+    if not file_size:
         return meta
 
-    suffix = Path(file_name or "clip.mp4").suffix or ".mp4"
-    temp_path: Path | None = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(video_bytes)
-            temp_path = Path(tmp.name)
-
         proc = subprocess.run(
             [
                 "ffprobe",
@@ -630,7 +835,7 @@ def _probe_video_metadata(file_name: str, video_bytes: bytes) -> dict[str, Any]:
                 "-show_streams",
                 "-print_format",
                 "json",
-                str(temp_path),
+                str(path),
             ],
             capture_output=True,
             text=True,
@@ -685,12 +890,79 @@ def _probe_video_metadata(file_name: str, video_bytes: bytes) -> dict[str, Any]:
     except Exception:
         meta["probe_status"] = "ffprobe_failed"
         return meta
-    finally:
-        if temp_path is not None:
-            try:
-                temp_path.unlink(missing_ok=True)
-            except Exception:
-                pass
+
+
+def _upload_digest(video_bytes: bytes | memoryview) -> str:
+    """Fingerprint an upload from its first MiB; only used when the upload has no file_id."""
+    return hashlib.blake2b(memoryview(video_bytes)[:1_048_576], digest_size=16).hexdigest()
+
+
+def _upload_cache_id(uploaded: Any) -> str:
+    """Stable per-upload id: Streamlit's file_id when present, else a content fingerprint."""
+    file_id = getattr(uploaded, "file_id", None) or getattr(uploaded, "id", None)
+    if file_id:
+        return str(file_id)
+    with uploaded.getbuffer() as view:
+        return _upload_digest(view)
+
+
+@lru_cache(maxsize=1)
+def _upload_spool_dir() -> str:
+    """Per-process directory for upload spools, removed when the process exits."""
+    path = tempfile.mkdtemp(prefix="ifs-upload-")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+class _UploadSpool(dict):
+    """Spool record kept in session state; a dict subclass so its file can follow it via `weakref.finalize`."""
+
+
+def _spool_upload(uploaded: Any) -> tuple[str, int]:
+    """Copy an uploaded file to a temp file in chunks and return (path, size)."""
+    suffix = Path(getattr(uploaded, "name", "") or "clip.mp4").suffix or ".mp4"
+    uploaded.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=_upload_spool_dir()) as tmp:
+        shutil.copyfileobj(uploaded, tmp, length=8 * 1024 * 1024)
+    uploaded.seek(0)
+    return tmp.name, os.path.getsize(tmp.name)
+
+
+def _discard_upload_spool() -> None:
+    spool = st.session_state.pop("ifs_rough_cut_spool", None)
+    if spool and spool.get("path"):
+        Path(spool["path"]).unlink(missing_ok=True)
+
+
+def _spooled_upload(uploaded: Any) -> dict[str, Any]:
+    """Return the temp-file spool for the current upload, replacing the spool of a previous upload.
+
+    The record also carries the probed metadata (`meta`) once the Edit tab has probed the file.
+    The temp file is deleted when the record is garbage-collected, so a session that ends or
+    reloads without clearing its upload does not leave the file behind.
+    """
+    file_id = _upload_cache_id(uploaded)
+    spool = st.session_state.get("ifs_rough_cut_spool")
+    if spool and spool.get("file_id") == file_id and Path(spool["path"]).is_file():
+        return spool
+
+    _discard_upload_spool()
+    path, size = _spool_upload(uploaded)
+    spool = _UploadSpool(file_id=file_id, path=path, size=size)
+    weakref.finalize(spool, Path(path).unlink, missing_ok=True)
+    st.session_state["ifs_rough_cut_spool"] = spool
+    return spool
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _probe_video_metadata_cached(
+    file_id: str,
+    file_name: str,
+    file_size: int,
+    _video_path: str,
+) -> dict[str, Any]:
+    """Cached `_probe_video_metadata` keyed on (file_id, name, size); the temp path is not hashed."""
+    return _probe_video_metadata(file_name, _video_path)
 
 
 def _normalize_clip_duration_seconds(
@@ -735,7 +1007,32 @@ def _clip_note_snippets(notes: str) -> list[str]:
     return snippets
 
 
-def _rough_cut_rows_to_csv(rows: Sequence[dict[str, Any]]) -> str:
+class RoughCutRow(NamedTuple):
+    """One timestamped flag in a rough-cut timeline."""
+
+    timestamp: str
+    priority: str
+    focus: str
+    issue: str
+    observation: str
+    action: str
+    confidence: str
+    start_seconds: int
+    end_seconds: int
+
+
+def _row_field(row: RoughCutRow | dict[str, Any], name: str, default: Any = "") -> Any:
+    """Read a timeline field from a `RoughCutRow` or a legacy dict row (e.g. loaded workspaces)."""
+    if isinstance(row, dict):
+        return row.get(name, default)
+    return getattr(row, name, default)
+
+
+def _rough_cut_rows_as_dicts(rows: Sequence[RoughCutRow | dict[str, Any]]) -> list[dict[str, Any]]:
+    return [dict(row) if isinstance(row, dict) else row._asdict() for row in rows]
+
+
+def _rough_cut_rows_to_csv(rows: Sequence[RoughCutRow | dict[str, Any]]) -> str:
     if not rows:
         return ""
     fieldnames = [
@@ -751,11 +1048,51 @@ def _rough_cut_rows_to_csv(rows: Sequence[dict[str, Any]]) -> str:
     writer = csv.DictWriter(out, fieldnames=fieldnames)
     writer.writeheader()
     for row in rows:
-        writer.writerow({name: row.get(name, "") for name in fieldnames})
+        writer.writerow({name: _row_field(row, name) for name in fieldnames})
     return out.getvalue()
 
 
-def _rough_cut_table_markdown(rows: Sequence[dict[str, Any]]) -> str:
+def _dumps_pretty(value: Any) -> str:
+    """Indented JSON for prompts; orjson when installed, stdlib otherwise."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(value, indent=2)
+
+
+def _rough_cut_rows_key(rows: Sequence[RoughCutRow | dict[str, Any]]) -> tuple[tuple[Any, ...], ...]:
+    """Hashable form of the timeline rows, used to key the cached exports."""
+    return tuple(tuple(_row_field(row, name) for name in RoughCutRow._fields) for row in rows)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _rough_cut_csv_export(rows_key: tuple[tuple[Any, ...], ...]) -> str:
+    return _rough_cut_rows_to_csv([RoughCutRow._make(values) for values in rows_key])
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _rough_cut_json_export(rows_key: tuple[tuple[Any, ...], ...]) -> str:
+    rows = [dict(zip(RoughCutRow._fields, values)) for values in rows_key]
+    if orjson is not None:
+        return orjson.dumps(rows).decode("utf-8")
+    return json.dumps(rows, separators=(",", ":"))
+
+
+_ROUGH_CUT_DISPLAY_COLUMNS = {
+    "timestamp": "Time",
+    "priority": "Priority",
+    "focus": "Focus",
+    "issue": "Issue",
+    "observation": "Observation",
+    "action": "Recommended Cut",
+}
+
+
+def _rough_cut_display_frame(rows: Sequence[RoughCutRow | dict[str, Any]]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(_rough_cut_rows_as_dicts(rows), columns=list(RoughCutRow._fields))
+    return frame.rename(columns=_ROUGH_CUT_DISPLAY_COLUMNS)[list(_ROUGH_CUT_DISPLAY_COLUMNS.values())].fillna("")
+
+
+def _rough_cut_table_lines(rows: Sequence[RoughCutRow | dict[str, Any]]) -> list[str]:
     lines = [
         "| Time | Priority | Focus | Issue | Observation | Recommended Cut |",
         "|---|---|---|---|---|---|",
@@ -763,26 +1100,26 @@ def _rough_cut_table_markdown(rows: Sequence[dict[str, Any]]) -> str:
     for row in rows:
         lines.append(
             "| {timestamp} | {priority} | {focus} | {issue} | {observation} | {action} |".format(
-                timestamp=str(row.get("timestamp", "")).replace("|", "/"),
-                priority=str(row.get("priority", "")).replace("|", "/"),
-                focus=str(row.get("focus", "")).replace("|", "/"),
-                issue=str(row.get("issue", "")).replace("|", "/"),
-                observation=str(row.get("observation", "")).replace("|", "/"),
-                action=str(row.get("action", "")).replace("|", "/"),
+                timestamp=str(_row_field(row, "timestamp")).replace("|", "/"),
+                priority=str(_row_field(row, "priority")).replace("|", "/"),
+                focus=str(_row_field(row, "focus")).replace("|", "/"),
+                issue=str(_row_field(row, "issue")).replace("|", "/"),
+                observation=str(_row_field(row, "observation")).replace("|", "/"),
+                action=str(_row_field(row, "action")).replace("|", "/"),
             )
         )
-    return "\n".join(lines)
+    return lines
 
 
-def _rough_cut_rows_summary(rows: Sequence[dict[str, Any]]) -> str:
+def _rough_cut_rows_summary(rows: Sequence[RoughCutRow | dict[str, Any]]) -> str:
     if not rows:
         return "No rough-cut timeline flags."
 
     priority_counts: dict[str, int] = {}
     issue_counts: dict[str, int] = {}
     for row in rows:
-        priority = str(row.get("priority", "Unknown"))
-        issue = str(row.get("issue", "General"))
+        priority = str(_row_field(row, "priority", "Unknown"))
+        issue = str(_row_field(row, "issue", "General"))
         priority_counts[priority] = priority_counts.get(priority, 0) + 1
         issue_counts[issue] = issue_counts.get(issue, 0) + 1
 
@@ -792,10 +1129,11 @@ def _rough_cut_rows_summary(rows: Sequence[dict[str, Any]]) -> str:
     issue_text = ", ".join(
         f"{name} ({count})" for name, count in sorted(issue_counts.items(), key=lambda item: (-item[1], item[0]))[:4]
     ) or "No issue clusters"
-    first_times = ", ".join(str(row.get("timestamp", "")) for row in rows[:5])
+    first_times = ", ".join(str(_row_field(row, "timestamp")) for row in islice(rows, 5))
     return f"Priorities -> {prio_text}. Top issue clusters -> {issue_text}. First flagged windows -> {first_times}."
 
 
+@st.cache_data(show_spinner=False, max_entries=64)
 def _fallback_rough_cut_rows(
     *,
     project: str,
@@ -810,7 +1148,7 @@ def _fallback_rough_cut_rows(
     segment_seconds: int,
     notes: str,
     file_name: str,
-) -> list[dict[str, Any]]:
+) -> list[RoughCutRow]:
     rng = random.Random(
         _seed_for(
             project,
@@ -863,7 +1201,7 @@ def _fallback_rough_cut_rows(
         "remove one redundant angle and keep the strongest eyeline match",
     ]
 
-    rows: list[dict[str, Any]] = []
+    rows: list[RoughCutRow] = []
     for idx, segment in enumerate(segments):
         start = segment["start"]
         end = segment["end"]
@@ -890,17 +1228,17 @@ def _fallback_rough_cut_rows(
             observation = f"{observation}; transcript/notes cue: \"{source_note}\""
 
         rows.append(
-            {
-                "timestamp": _format_timestamp_range(start, end),
-                "priority": priority,
-                "focus": focus_label,
-                "issue": issue,
-                "observation": observation,
-                "action": action,
-                "confidence": f"{0.58 + (idx % 4) * 0.08:.2f}",
-                "start_seconds": start,
-                "end_seconds": end,
-            }
+            RoughCutRow(
+                timestamp=_format_timestamp_range(start, end),
+                priority=priority,
+                focus=focus_label,
+                issue=issue,
+                observation=observation,
+                action=action,
+                confidence=f"{0.58 + (idx % 4) * 0.08:.2f}",
+                start_seconds=start,
+                end_seconds=end,
+            )
         )
 
     return rows
@@ -918,7 +1256,7 @@ def _fallback_rough_cut_review(
     pace: int,
     issues: Sequence[str],
     metadata: dict[str, Any],
-    rows: Sequence[dict[str, Any]],
+    rows: Sequence[RoughCutRow | dict[str, Any]],
     review_question: str,
 ) -> str:
     duration_seconds = _normalize_clip_duration_seconds(metadata, 90)
@@ -927,10 +1265,10 @@ def _fallback_rough_cut_review(
     fps = metadata.get("fps")
     res_text = f"{width}x{height}" if width and height else "Unknown"
     fps_text = f"{fps:.2f}" if isinstance(fps, (float, int)) else "Unknown"
-    flagged_high = [row["timestamp"] for row in rows if row.get("priority") == "High"]
+    flagged_high = [_row_field(row, "timestamp") for row in rows if _row_field(row, "priority") == "High"]
     repeated_issues: dict[str, int] = {}
     for row in rows:
-        label = str(row.get("issue", "General"))
+        label = str(_row_field(row, "issue", "General"))
         repeated_issues[label] = repeated_issues.get(label, 0) + 1
     top_issues = sorted(repeated_issues.items(), key=lambda item: (-item[1], item[0]))[:3]
     issue_summary = ", ".join(f"{name} ({count})" for name, count in top_issues) or "none"
@@ -947,21 +1285,25 @@ def _fallback_rough_cut_review(
         f"- Runtime target context: {runtime_target} min ({pacing.lower()} pacing profile)",
         "",
         "### Timestamped Cut Notes",
-        _rough_cut_table_markdown(rows),
-        "",
-        "### Pattern Diagnosis",
-        f"- Most repeated issues: {issue_summary}.",
-        f"- Highest-priority zones: {', '.join(flagged_high) if flagged_high else 'No high-priority zones flagged in this pass.'}",
-        f"- Rhythm profile suggests {'compression' if pace >= 60 else 'selective expansion'} around the midpoint to protect {objective.lower()}.",
-        f"- Energy/Pace balance ({energy}/{pace}) supports {'hard cuts and movement-based transitions' if energy >= 65 else 'clean reaction holds and motivated dissolves'} as the default strategy.",
-        "",
-        "### First Pass Fix Order",
-        "1. Resolve all High priority timestamp flags before color or polish passes.",
-        "2. Rebuild geography around the first confusion point using one orienting shot or clearer eyeline progression.",
-        "3. Tighten dead air inside repeated setup beats, then re-check emotional readability.",
-        "4. Rewatch without audio once to validate visual continuity and story comprehension.",
-        "5. Rewatch audio-only to catch dialogue clarity dips and L-cut opportunities.",
     ]
+    lines.extend(_rough_cut_table_lines(rows))
+    lines.extend(
+        [
+            "",
+            "### Pattern Diagnosis",
+            f"- Most repeated issues: {issue_summary}.",
+            f"- Highest-priority zones: {', '.join(flagged_high) if flagged_high else 'No high-priority zones flagged in this pass.'}",
+            f"- Rhythm profile suggests {'compression' if pace >= 60 else 'selective expansion'} around the midpoint to protect {objective.lower()}.",
+            f"- Energy/Pace balance ({energy}/{pace}) supports {'hard cuts and movement-based transitions' if energy >= 65 else 'clean reaction holds and motivated dissolves'} as the default strategy.",
+            "",
+            "### First Pass Fix Order",
+            "1. Resolve all High priority timestamp flags before color or polish passes.",
+            "2. Rebuild geography around the first confusion point using one orienting shot or clearer eyeline progression.",
+            "3. Tighten dead air inside repeated setup beats, then re-check emotional readability.",
+            "4. Rewatch without audio once to validate visual continuity and story comprehension.",
+            "5. Rewatch audio-only to catch dialogue clarity dips and L-cut opportunities.",
+        ]
+    )
     return "\n".join(lines)
 
 
@@ -1004,9 +1346,13 @@ def _snapshot_section_text(snapshot: dict[str, Any], field_key: str) -> str:
 def _capture_workspace_snapshot() -> dict[str, Any]:
     settings = {key: st.session_state.get(key) for key in WORKSPACE_SETTINGS_KEYS}
     outputs = {key: st.session_state.get(key) for key in WORKSPACE_OUTPUT_KEYS}
-    history = st.session_state.get("ifs_history", [])
+    history = [
+        {key: value for key, value in item.items() if key not in _HISTORY_HTML_KEYS}
+        for item in st.session_state.get("ifs_history", [])
+    ]
     project_title = str(st.session_state.get("ifs_project_title", "Untitled Project"))
-    rough_cut_rows = outputs.get("ifs_rough_cut_timeline_rows") or []
+    rough_cut_rows = _rough_cut_rows_as_dicts(outputs.get("ifs_rough_cut_timeline_rows") or [])
+    outputs["ifs_rough_cut_timeline_rows"] = rough_cut_rows
 
     return {
         "saved_at": _workspace_now_iso(),
@@ -1036,8 +1382,12 @@ def _apply_workspace_snapshot(snapshot: dict[str, Any]) -> None:
     for key in WORKSPACE_OUTPUT_KEYS:
         if key in outputs:
             st.session_state[key] = outputs[key]
+    st.session_state["ifs_rough_cut_timeline_df"] = None
     if isinstance(history, list):
-        st.session_state["ifs_history"] = history
+        st.session_state["ifs_history"] = deque(
+            (_escape_history_item(dict(item)) for item in history if isinstance(item, dict)),
+            maxlen=HISTORY_LIMIT,
+        )
 
     title = str(settings.get("ifs_project_title") or snapshot.get("project_title") or "Untitled Project")
     st.session_state["ifs_project_title"] = title
@@ -1383,7 +1733,9 @@ def _workspace_markdown_bundle(snapshot: dict[str, Any]) -> str:
 
     timeline_rows = outputs.get("ifs_rough_cut_timeline_rows")
     if isinstance(timeline_rows, list) and timeline_rows:
-        lines.extend(["## Rough Cut Timeline Flags", "", _rough_cut_table_markdown(timeline_rows), ""])
+        lines.extend(["## Rough Cut Timeline Flags", ""])
+        lines.extend(_rough_cut_table_lines(timeline_rows))
+        lines.append("")
 
     if isinstance(history, list) and history:
         lines.extend(["## Session History (Recent)", ""])
@@ -1665,7 +2017,7 @@ def _fallback_deck(
     storyboard: str,
     edit: str,
     rough_cut: str = "",
-    rough_cut_rows: Sequence[dict[str, Any]] | None = None,
+    rough_cut_rows: Sequence[RoughCutRow | dict[str, Any]] | None = None,
 ) -> str:
     has_script = "ready" if script else "pending"
     has_story = "ready" if storyboard else "pending"
@@ -1696,190 +2048,1069 @@ def _fallback_deck(
     )
 
 
-def _generate_text(
-    ai_client: Any,
-    model: str,
-    system_prompt: str,
-    user_prompt: str,
-    temperature: float,
-) -> tuple[str, str]:
-    """Return (content, status) for a live OpenAI request."""
+def _hedge_delay_seconds() -> float | None:
+    """Seconds to wait before hedging a chat request (`IFS_HEDGE_AFTER_SECONDS`); None disables hedging."""
     try:
-        resp = ai_client.chat(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=temperature,
-        )
-        return _extract_content(resp), "live"
-    except Exception as exc:
-        raise RuntimeError(f"OpenAI request failed: {exc}") from exc
+        delay = float(os.getenv("IFS_HEDGE_AFTER_SECONDS", "").strip())
+    except ValueError:
+        return None
+    return delay if delay > 0 else None
 
 
-def _sidebar_controls() -> None:
-    st.sidebar.markdown("## Advanced Settings")
-    st.sidebar.caption("The main page keeps the workflow simple. Open these only when you need extra control.")
+_HEDGE_POOL: ThreadPoolExecutor | None = None
+_HEDGE_POOL_LOCK = threading.Lock()
 
-    with st.sidebar.expander("Look and pacing", expanded=False):
-        preset_names = [preset["name"] for preset in STYLE_PRESETS]
-        st.selectbox("Style preset", preset_names, key="ifs_preset")
 
-        preset_cols = st.columns(2)
-        if preset_cols[0].button("Apply preset", key="apply_preset", use_container_width=True):
-            _apply_preset(st.session_state["ifs_preset"])
-            _rerun()
-        if preset_cols[1].button("Randomize", key="random_profile", use_container_width=True):
-            _randomize_profile()
-            _rerun()
+def _hedge_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for hedged requests; plain module state so worker threads can use it too.
 
-        st.selectbox("Genre", GENRES, key="ifs_genre")
-        st.selectbox("Tone", TONES, key="ifs_tone")
-        st.selectbox("Camera style", CAMERA_STYLES, key="ifs_camera_style")
-        st.selectbox("Palette", PALETTES, key="ifs_palette")
-        st.selectbox("Focus area", FOCUS_AREAS, key="ifs_focus")
-        st.slider("Energy", 0, 100, key="ifs_energy")
-        st.slider("Pace", 0, 100, key="ifs_pace")
-        st.slider("Creativity", 0.1, 1.2, key="ifs_temperature")
+    Every generation a session runs at once may hold two requests (primary and hedge).
+    """
+    global _HEDGE_POOL
+    with _HEDGE_POOL_LOCK:
+        if _HEDGE_POOL is None:
+            _HEDGE_POOL = ThreadPoolExecutor(
+                max_workers=2 * GENERATION_WORKERS_PER_SESSION, thread_name_prefix="ifs-hedge"
+            )
+        return _HEDGE_POOL
 
-        active_preset = _preset_by_name(st.session_state["ifs_preset"])
-        st.caption(f"Preset: {active_preset['tagline']}")
 
-    with st.sidebar.expander("Model", expanded=False):
-        st.text_input("Model", key="ifs_model")
-        st.caption("Set `OPENAI_API_KEY` in Streamlit secrets or `.env` to run the app.")
+class _SessionPool:
+    """Session-state holder for a generation pool; the pool is shut down once the session drops it."""
 
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=GENERATION_WORKERS_PER_SESSION, thread_name_prefix="ifs-generate"
+        )
+        weakref.finalize(self, self.executor.shutdown, wait=False)
 
-def _top_section(ai_client: Any) -> None:
-    concept = CONCEPT_SEEDS[st.session_state["ifs_concept_idx"]]
-    provider_chain = _provider_chain_text(ai_client)
-    st.title("Infinity Film Studio")
-    st.caption("Simple workflow: set a project, write a premise, copy it to storyboard, then generate what you need with OpenAI.")
 
-    st.text_input("Project title", key="ifs_project_title")
+def _generation_executor() -> ThreadPoolExecutor:
+    """This session's pool for generations that run while the page keeps rendering (see `_script_pending_poller`).
 
-    info_cols = st.columns(2)
-    info_cols[0].markdown("**Mode:** OpenAI API")
-    info_cols[0].markdown(f"**Provider:** `{provider_chain}`")
-    info_cols[1].markdown(
-        f"**Current style:** {st.session_state['ifs_genre']} / {st.session_state['ifs_tone']} / {st.session_state['ifs_focus']}"
-    )
-    info_cols[1].markdown(f"**Camera / palette:** {st.session_state['ifs_camera_style']} / {st.session_state['ifs_palette']}")
+    Each session gets its own small pool so one user's Generate All cannot queue behind another's.
+    """
+    holder = st.session_state.get("ifs_generation_pool")
+    if holder is None:
+        holder = _SessionPool()
+        st.session_state["ifs_generation_pool"] = holder
+    return holder.executor
 
-    st.markdown("**Starting concept**")
-    st.write(concept)
 
-    action_cols = st.columns(3)
-    if action_cols[0].button("Shuffle Concept", key="shuffle_concept_top", use_container_width=True):
-        st.session_state["ifs_concept_idx"] = (st.session_state["ifs_concept_idx"] + 1) % len(CONCEPT_SEEDS)
-        st.session_state["ifs_status_line"] = "Concept changed. Load it into Script if you want to use it."
-        _rerun()
+def _hedged_chat(ai_client: Any, delay: float, **request: Any) -> Any:
+    """Send `request`, then a duplicate if no answer arrived within `delay`; the first success wins.
 
-    if action_cols[1].button("Load Concept into Script", key="load_concept_script", use_container_width=True):
-        st.session_state["ifs_script_prompt"] = concept
-        st.session_state["ifs_status_line"] = "Active concept copied into the script premise."
-        _rerun()
+    Chat completions are idempotent, so the slower response is simply discarded. A primary that
+    fails before the delay is not retried.
+    """
+    pool = _hedge_executor()
+    primary = pool.submit(ai_client.chat, **request)
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeout:
+        pass
 
-    if action_cols[2].button("Use Concept in Both", key="sync_concept", use_container_width=True):
-        st.session_state["ifs_script_prompt"] = concept
-        _set_story_prompt(concept, "concept", "Active concept copied into script and storyboard.")
-        _rerun()
+    pending = {primary, pool.submit(ai_client.chat, **request)}
+    error: BaseException | None = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error or RuntimeError("hedged request returned no result")
 
-    st.info(f"Status: {st.session_state['ifs_status_line']}")
 
+def _is_timeout_error(exc: BaseException) -> bool:
+    # Matches builtin/futures timeouts plus the SDK's APITimeoutError and httpx's *Timeout
+    # errors by name, so the OpenAI package does not have to be imported here.
+    return isinstance(exc, TimeoutError) or "timeout" in type(exc).__name__.lower()
 
-def _script_tab(ai_client: Any) -> None:
-    st.subheader("Script")
-    st.caption("Write a premise and generate a script pack.")
 
-    st.text_area("Scene premise", key="ifs_script_prompt", height=120)
+def _new_breaker() -> dict[str, Any]:
+    # Generate All workers share the session's breaker, so updates happen under its lock.
+    return {"timeouts": 0, "degraded": False, "last_seconds": None, "lock": threading.Lock()}
 
-    script_premise = str(st.session_state["ifs_script_prompt"] or "").strip()
-    story_prompt = str(st.session_state["ifs_story_prompt"] or "").strip()
-    story_matches_script = bool(script_premise) and story_prompt == script_premise
 
-    controls = st.columns(3)
-    generate = controls[0].button("Generate Script Pack", type="primary", use_container_width=True)
-    if controls[1].button(
-        "Copy Premise to Storyboard",
-        key="push_story",
-        use_container_width=True,
-        help="Copies the current scene premise into the storyboard input. It does not generate a shot grid.",
-    ):
-        _set_story_prompt(st.session_state["ifs_script_prompt"], "script", "Scene premise copied to storyboard input.")
-        _rerun()
-    if controls[2].button("Clear Script Output", key="clear_script", use_container_width=True):
-        st.session_state["ifs_script_output"] = ""
-        st.session_state["ifs_status_line"] = "Script output cleared."
-        _rerun()
+def _request_guard() -> dict[str, Any]:
+    """Session timeout settings plus the breaker dict `_generate_text` updates (safe to hand to workers)."""
+    ss = st.session_state
+    return {
+        "timeout": float(ss.get("ifs_timeout") or DEFAULT_REQUEST_TIMEOUT_SECONDS),
+        "fallback_model": str(ss.get("ifs_fallback_model") or "").strip(),
+        "light_model": _light_model_for_session(),
+        "breaker": ss.setdefault("ifs_breaker", _new_breaker()),
+    }
 
-    if not script_premise:
-        st.caption("Add a scene premise above to generate a script pack or copy it into Storyboard.")
-    elif story_matches_script:
-        st.caption("Storyboard input already matches this scene premise. Open Storyboard and click Generate Shot Grid to create frames.")
-    else:
-        st.caption("Copy Premise to Storyboard only fills the storyboard input. Shot generation happens separately on the Storyboard tab.")
 
-    if generate:
-        project = st.session_state["ifs_project_title"]
-        genre = st.session_state["ifs_genre"]
-        tone = st.session_state["ifs_tone"]
-        focus = st.session_state["ifs_focus"]
-        energy = st.session_state["ifs_energy"]
-        pace = st.session_state["ifs_pace"]
-        model = st.session_state["ifs_model"].strip() or DEFAULT_CHAT_MODEL
-        premise = st.session_state["ifs_script_prompt"]
-        temperature = float(st.session_state["ifs_temperature"])
+def _light_model_for_session() -> str:
+    """`LIGHT_CHAT_MODEL` when routing is switched on and the user kept the default model, else ""."""
+    ss = st.session_state
+    chosen_model = str(ss.get("ifs_model") or "").strip()
+    if not LIGHT_CHAT_MODEL or not ss.get("ifs_auto_route"):
+        return ""
+    # A model typed into the sidebar is always honoured.
+    if chosen_model and chosen_model != DEFAULT_CHAT_MODEL:
+        return ""
+    return LIGHT_CHAT_MODEL
+
+
+def _routed_model(model: str, user_prompt: str, guard: Mapping[str, Any] | None) -> str:
+    """The guard's light model for short prompts that do not ask for a scene excerpt, else `model`."""
+    light_model = (guard or {}).get("light_model") or ""
+    if light_model and len(user_prompt) < LIGHT_PROMPT_MAX_CHARS and "Scene excerpt" not in user_prompt:
+        return light_model
+    return model
+
+
+def _reset_breaker() -> None:
+    st.session_state["ifs_breaker"] = _new_breaker()
+    st.session_state["ifs_status_line"] = "Main model re-enabled."
+
 
-        system_prompt = (
-            "You are a film development copilot. Provide concise but high-impact outputs "
-            "for directors and producers. Return markdown with clear section headings."
+def _generate_text(
+    ai_client: Any,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    on_delta: Callable[[str], None] | None = None,
+    guard: Mapping[str, Any] | None = None,
+) -> tuple[str, str]:
+    """Return (content, status) for a live OpenAI request.
+
+    With `on_delta`, the completion is streamed and each text piece is passed to it as it arrives.
+    Otherwise, when `IFS_HEDGE_AFTER_SECONDS` is set, a slow request is hedged (see `_hedged_chat`).
+
+    `guard` (see `_request_guard`) adds a per-request timeout and a fallback model that is tried
+    once when the primary times out; the SDK's own retries are switched off for an attempt that
+    has a fallback behind it. After `BREAKER_TIMEOUT_LIMIT` consecutive timeouts the breaker
+    marks the session degraded and later requests go straight to the fallback model.
+    With auto-routing on, short prompts are sent to the light model first (`_routed_model`);
+    the status names any model other than `model` that answered.
+    """
+    guard = guard or {}
+    breaker = guard.get("breaker")
+    fallback_model = guard.get("fallback_model") or ""
+    primary = _routed_model(model, user_prompt, guard)
+    models = [primary]
+    if fallback_model and fallback_model != primary:
+        degraded = False
+        if breaker is not None:
+            with breaker["lock"]:
+                degraded = breaker["degraded"]
+        models = [fallback_model] if degraded else [primary, fallback_model]
+
+    request = {
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": temperature,
+    }
+    if guard.get("timeout"):
+        request["timeout"] = guard["timeout"]
+    delay = _hedge_delay_seconds()
+    for attempt, attempt_model in enumerate(models):
+        status = "live" if attempt_model == model else f"live via {attempt_model}"
+        attempt_request = {**request, "max_retries": 0} if attempt + 1 < len(models) else request
+        started = time.perf_counter()
+        parts: list[str] = []
+        try:
+            if on_delta is not None:
+                for chunk in ai_client.chat(stream=True, model=attempt_model, **attempt_request):
+                    piece = _extract_delta(chunk)
+                    if piece:
+                        parts.append(piece)
+                        on_delta(piece)
+                content = "".join(parts)
+            elif delay is None:
+                content = _extract_content(ai_client.chat(model=attempt_model, **attempt_request))
+            else:
+                content = _extract_content(_hedged_chat(ai_client, delay, model=attempt_model, **attempt_request))
+        except Exception as exc:
+            timed_out = _is_timeout_error(exc)
+            if breaker is not None and timed_out:
+                with breaker["lock"]:
+                    breaker["timeouts"] += 1
+                    if breaker["timeouts"] >= BREAKER_TIMEOUT_LIMIT and fallback_model:
+                        breaker["degraded"] = True
+            # A stream that already delivered text cannot be restarted on another model.
+            if timed_out and attempt + 1 < len(models) and not parts:
+                continue
+            raise RuntimeError(f"OpenAI request failed: {exc}") from exc
+        if breaker is not None:
+            with breaker["lock"]:
+                breaker["last_seconds"] = round(time.perf_counter() - started, 2)
+                if attempt_model == primary:
+                    breaker["timeouts"] = 0
+        return content, status
+    raise RuntimeError("OpenAI request failed: no model to try")
+
+
+def _prompt_cache_key(endpoint: str, model: str, temperature: float, system_prompt: str, user_prompt: str) -> str:
+    payload = "\x1f".join([endpoint, model, f"{temperature:.3f}", system_prompt, user_prompt])
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class GenerationDiskCache:
+    """Prompt-hash -> (content, status) store in SQLite (WAL), kept across restarts.
+
+    The cache is shared by every session of the server process, so a response generated for one
+    user can be served to anyone sending the identical prompt. Rows expire after `ttl_seconds`
+    and only the newest `max_rows` are kept. Lookups are best effort: a locked or unreadable
+    database behaves like a cache miss.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_rows: int = DISK_CACHE_MAX_ROWS,
+        ttl_seconds: float = DISK_CACHE_TTL_SECONDS,
+    ):
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS generations "
+            "(key TEXT PRIMARY KEY, content TEXT NOT NULL, status TEXT NOT NULL, created_at REAL NOT NULL)"
         )
-        user_prompt = textwrap.dedent(
-            f"""
-            Project title: {project}
-            Genre: {genre}
-            Tone: {tone}
-            Focus area: {focus}
-            Energy: {energy}/100
-            Pace: {pace}/100
-            Premise: {premise}
-
-            Produce:
-            1) Logline (1 paragraph)
-            2) 8-beat outline (numbered)
-            3) Scene excerpt (~180 words)
-            4) Director notes (4 bullets)
-            """
-        ).strip()
-
-        with st.spinner("Generating script pack..."):
-            content, status = _generate_text(
+        self._conn.execute("CREATE INDEX IF NOT EXISTS generations_created_at ON generations (created_at)")
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT content, status FROM generations WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl_seconds),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, content: str, status: str) -> None:
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO generations (key, content, status, created_at) VALUES (?, ?, ?, ?)",
+                    (key, content, status, now),
+                )
+                self._conn.execute("DELETE FROM generations WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._conn.execute(
+                    "DELETE FROM generations WHERE key NOT IN "
+                    "(SELECT key FROM generations ORDER BY created_at DESC LIMIT ?)",
+                    (self.max_rows,),
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> int:
+        try:
+            with self._lock:
+                return self._conn.execute("DELETE FROM generations").rowcount
+        except sqlite3.Error:
+            return 0
+
+
+def _cache_dir() -> Path:
+    """`IFS_CACHE_DIR`, else the per-user cache directory (`$XDG_CACHE_HOME` or ~/.cache), never the repo tree."""
+    custom_dir = os.getenv("IFS_CACHE_DIR", "").strip()
+    if custom_dir:
+        return Path(custom_dir).expanduser()
+    base = os.getenv("XDG_CACHE_HOME", "").strip() or Path.home() / ".cache"
+    return Path(base) / "infinity-film-studio"
+
+
+def _shared_cache_clear_allowed() -> bool:
+    """Only operators who set `IFS_ALLOW_SHARED_CACHE_CLEAR` may wipe the cache every session shares."""
+    return os.getenv("IFS_ALLOW_SHARED_CACHE_CLEAR", "").strip().lower() in {"1", "true", "yes"}
+
+
+@st.cache_resource
+def _disk_cache() -> GenerationDiskCache | None:
+    try:
+        cache_dir = _cache_dir()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return GenerationDiskCache(cache_dir / "generation_cache.sqlite3")
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def _prompt_cache() -> OrderedDict[str, tuple[str, str]]:
+    return st.session_state.setdefault("ifs_prompt_cache", OrderedDict())
+
+
+def _cached_prompt_result(cache_key: str) -> tuple[str, str] | None:
+    """Return (content, "cached") for a prompt already answered, unless bypassed.
+
+    Checks this session's LRU first, then the on-disk cache shared across sessions and restarts.
+    """
+    if st.session_state.get("ifs_cache_bypass"):
+        return None
+    cache = _prompt_cache()
+    hit = cache.get(cache_key)
+    if hit is not None:
+        cache.move_to_end(cache_key)
+        return hit[0], "cached"
+    disk = _disk_cache()
+    hit = disk.get(cache_key) if disk is not None else None
+    if hit is None:
+        return None
+    _remember_in_session(cache_key, *hit)
+    return hit[0], "cached"
+
+
+def _remember_in_session(cache_key: str, content: str, status: str) -> None:
+    cache = _prompt_cache()
+    cache[cache_key] = (content, status)
+    cache.move_to_end(cache_key)
+    while len(cache) > PROMPT_CACHE_LIMIT:
+        cache.popitem(last=False)
+
+
+def _remember_prompt_result(cache_key: str, content: str, status: str) -> None:
+    _remember_in_session(cache_key, content, status)
+    disk = _disk_cache()
+    if disk is not None:
+        disk.put(cache_key, content, status)
+
+
+def _clear_session_cache() -> None:
+    st.session_state["ifs_prompt_cache"] = OrderedDict()
+    st.session_state["ifs_status_line"] = "Session generation cache cleared."
+
+
+def _clear_shared_cache() -> None:
+    st.session_state["ifs_prompt_cache"] = OrderedDict()
+    disk = _disk_cache()
+    if disk is None or not _shared_cache_clear_allowed():
+        st.session_state["ifs_status_line"] = "Session generation cache cleared; the shared disk cache was left alone."
+        return
+    removed = disk.clear()
+    st.session_state["ifs_status_line"] = f"Shared generation cache cleared ({removed} saved responses removed)."
+
+
+def _markdown_streamer(placeholder: Any) -> Callable[[str], None]:
+    """`on_delta` callback that redraws `placeholder` with the text streamed so far."""
+    parts: list[str] = []
+
+    def _on_delta(piece: str) -> None:
+        parts.append(piece)
+        placeholder.markdown("".join(parts) + " ▌")
+
+    return _on_delta
+
+
+def _session_generate(
+    ai_client: Any,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    on_delta: Callable[[str], None] | None = None,
+) -> tuple[str, str]:
+    """`_generate_text` behind the session prompt cache; failures raise and are never cached.
+
+    Cache hits return at once without calling `on_delta`.
+    """
+    guard = _request_guard()
+    cache_key = _prompt_cache_key(
+        _client_endpoint(ai_client), _routed_model(model, user_prompt, guard), temperature, system_prompt, user_prompt
+    )
+    hit = _cached_prompt_result(cache_key)
+    if hit is not None:
+        return hit
+    content, status = _generate_text(ai_client, model, system_prompt, user_prompt, temperature, on_delta, guard=guard)
+    _remember_prompt_result(cache_key, content, status)
+    return content, status
+
+
+# System prompts and the instruction half of each user template are static, so every request
+# opens with the same prefix and the variable project fields come last; that keeps the prefix
+# eligible for the provider's automatic prompt caching.
+_SCRIPT_SYS = (
+    "You are a film development copilot. Provide concise but high-impact outputs "
+    "for directors and producers. Return markdown with clear section headings."
+)
+_STORY_SYS = (
+    "You are a storyboard supervisor. Return practical, production-ready frame plans. "
+    "Use markdown table format and include continuity guardrails."
+)
+_EDIT_SYS = (
+    "You are a senior film editor. Provide concise, high-leverage feedback that is immediately "
+    "actionable in an editing suite."
+)
+_ROUGH_CUT_SYS = (
+    "You are a senior film editor reviewing a rough cut. Produce timestamped, production-ready notes "
+    "that improve pacing, clarity, geography, and emotional impact. Return markdown only."
+)
+_DECK_SYS = (
+    "You are an executive creative producer. Build a concise production deck summary "
+    "for a director and team kickoff meeting."
+)
+
+_SCRIPT_USER_TMPL = """\
+Produce:
+1) Logline (1 paragraph)
+2) 8-beat outline (numbered)
+3) Scene excerpt (~180 words)
+4) Director notes (4 bullets)
+
+Project title: {project}
+Genre: {genre}
+Tone: {tone}
+Focus area: {focus}
+Energy: {energy}/100
+Pace: {pace}/100
+Premise: {premise}"""
+
+_STORY_USER_TMPL = """\
+Output:
+- Markdown table with columns: Frame, Camera, Visual, Sound
+- Then 3 continuity guardrails as bullets
+
+Project title: {project}
+Tone: {tone}
+Camera style: {style}
+Palette: {palette}
+Focus area: {focus}
+Scene moment: {scene}
+Frame count: {frame_count}"""
+
+_EDIT_USER_TMPL = """\
+Output:
+- Prioritized numbered edit notes
+- End with a short Priority section (High/Medium/Finish)
+
+Project title: {project}
+Tone: {tone}
+Pacing profile: {pacing}
+Runtime target: {runtime_target} minutes
+Objective: {objective}
+Focus area: {focus}
+Energy: {energy}/100
+Pace: {pace}/100
+Issues: {issues}"""
+
+_ROUGH_CUT_USER_TMPL = """\
+Required output format:
+1) "Rough Cut Snapshot" bullets
+2) "Timestamped Cut Notes" markdown table with columns:
+   Time | Priority | Focus | Issue | Observation | Recommended Cut
+3) "Pattern Diagnosis" bullets
+4) "First Pass Fix Order" numbered list
+
+Keep recommendations concrete (frame trims, cut timing, inserts, L-cuts/J-cuts, reaction holds).
+
+Project title: {project}
+Tone: {tone}
+Pacing profile: {pacing}
+Runtime target: {runtime_target} minutes
+Objective: {objective}
+Focus area: {focus}
+Energy: {energy}/100
+Pace: {pace}/100
+Current issues: {issues}
+Review question: {review_question}
+
+Clip metadata (JSON):
+{metadata_json}
+
+Timeline segments under review:
+{segment_preview}
+
+Transcript / shot notes (may be partial):
+{transcript_excerpt}"""
+
+_DECK_USER_TMPL = """\
+Create markdown with sections:
+- Executive Summary
+- What Is Locked
+- What Needs Decisions
+- Production Risks
+- Next 5 Actions
+
+Project: {project}
+Director brief: {brief}
+
+Script pack:
+{script}
+
+Storyboard:
+{storyboard}
+
+Edit notes:
+{edit}
+
+Rough cut review:
+{rough_cut}
+
+Rough cut timeline summary:
+{rough_cut_summary}
+
+Rough cut metadata (JSON):
+{rough_cut_meta}"""
+
+# Single-request mode for Generate All: (response heading, output key, history kind, history title suffix).
+_COMBINED_SECTIONS = (
+    ("Script Pack", "ifs_script_output", "Script", "script pack"),
+    ("Storyboard", "ifs_storyboard_output", "Storyboard", "shot grid"),
+    ("Edit Notes", "ifs_edit_output", "Edit", "edit notes"),
+    ("Director Deck", "ifs_deck_output", "Deck", "director deck"),
+)
+_COMBINED_SYS = (
+    "You are a film development copilot covering writing, storyboarding, editing, and producing. "
+    "Return markdown only and follow the requested level-2 section headings exactly."
+)
+_COMBINED_USER_TMPL = """\
+Return exactly four sections in this order, each opened by its level-2 heading on its own line:
+## Script Pack
+## Storyboard
+## Edit Notes
+## Director Deck
+Use ### or deeper for any headings inside a section. The Director Deck summarizes the other three.
+
+[Script Pack request]
+{script}
+
+[Storyboard request]
+{storyboard}
+
+[Edit Notes request]
+{edit}
+
+[Director Deck request]
+Create markdown with sections:
+- Executive Summary
+- What Is Locked
+- What Needs Decisions
+- Production Risks
+- Next 5 Actions
+
+Director brief: {brief}"""
+
+_H2_HEADING_RE = re.compile(r"^##[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+
+
+def _split_h2_sections(markdown_text: str) -> dict[str, str]:
+    """Map each level-2 heading title to the stripped text up to the next level-2 heading."""
+    matches = list(_H2_HEADING_RE.finditer(markdown_text))
+    sections: dict[str, str] = {}
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(markdown_text)
+        sections[match.group(1).strip()] = markdown_text[match.end() : end].strip()
+    return sections
+
+
+def _script_user_prompt() -> str:
+    ss = st.session_state
+    return _SCRIPT_USER_TMPL.format(
+        project=ss["ifs_project_title"],
+        genre=ss["ifs_genre"],
+        tone=ss["ifs_tone"],
+        focus=ss["ifs_focus"],
+        energy=ss["ifs_energy"],
+        pace=ss["ifs_pace"],
+        premise=ss["ifs_script_prompt"],
+    )
+
+
+def _storyboard_user_prompt(focus: str) -> str:
+    ss = st.session_state
+    return _STORY_USER_TMPL.format(
+        project=ss["ifs_project_title"],
+        tone=ss["ifs_tone"],
+        style=ss["ifs_camera_style"],
+        palette=ss["ifs_palette"],
+        focus=focus,
+        scene=ss["ifs_story_prompt"],
+        frame_count=int(ss["ifs_frame_count"]),
+    )
+
+
+def _edit_user_prompt() -> str:
+    ss = st.session_state
+    issues = ss["ifs_edit_issues"]
+    return _EDIT_USER_TMPL.format(
+        project=ss["ifs_project_title"],
+        tone=ss["ifs_tone"],
+        pacing=ss["ifs_edit_pacing"],
+        runtime_target=ss["ifs_edit_runtime_target"],
+        objective=ss["ifs_edit_objective"],
+        focus=ss["ifs_focus"],
+        energy=ss["ifs_energy"],
+        pace=ss["ifs_pace"],
+        issues=", ".join(issues) if issues else "none",
+    )
+
+
+@lru_cache(maxsize=8)
+def _token_encoding(model: str) -> Any | None:
+    """tiktoken encoding for `model`, or None so `_budget_slice` counts characters instead.
+
+    tiktoken is optional (it is not in requirements.txt) and may need to download its BPE
+    files, so a missing package or any load failure falls back to None.
+    """
+    try:  # imported here so the tokenizer only loads once a deck prompt is built
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+_SECTION_START_RE = re.compile(r"^(?=#{2,3} )", re.MULTILINE)
+
+
+def _budget_slice(content: str, max_tokens: int, encoding: Any | None = None) -> str:
+    """Trim `content` to about `max_tokens`, keeping the head of every `##`/`###` section.
+
+    Each section gets an even share of the remaining budget and whatever a short section leaves
+    unused rolls over to the next, so a closing Priority section is not cut off entirely.
+    Without an `encoding`, a token is approximated as 4 characters.
+    """
+    budget = max_tokens if encoding is not None else max_tokens * 4
+    if len(encoding.encode(content) if encoding is not None else content) <= budget:
+        return content
+
+    sections = [part for part in _SECTION_START_RE.split(content) if part.strip()]
+    pieces: list[str] = []
+    for index, section in enumerate(sections):
+        share = budget // (len(sections) - index)
+        units = encoding.encode(section) if encoding is not None else section
+        kept = units[:share]
+        budget -= len(kept)
+        text = encoding.decode(kept) if encoding is not None else kept
+        pieces.append(text if len(kept) == len(units) else text.rstrip() + "\n\n")
+    return "".join(pieces).rstrip()
+
+
+def _deck_user_prompt() -> str:
+    ss = st.session_state
+    script_content = ss["ifs_script_output"]
+    storyboard_content = ss["ifs_storyboard_output"]
+    edit_content = ss["ifs_edit_output"]
+    rough_cut_content = ss.get("ifs_rough_cut_output", "")
+    rough_cut_meta = ss.get("ifs_rough_cut_metadata", {})
+    encoding = _token_encoding(ss["ifs_model"].strip() or DEFAULT_CHAT_MODEL)
+    return _DECK_USER_TMPL.format(
+        project=ss["ifs_project_title"],
+        brief=_build_director_brief(),
+        script=_budget_slice(script_content, 550, encoding) if script_content else "No script pack yet.",
+        storyboard=_budget_slice(storyboard_content, 550, encoding) if storyboard_content else "No storyboard yet.",
+        edit=_budget_slice(edit_content, 550, encoding) if edit_content else "No edit notes yet.",
+        rough_cut=_budget_slice(rough_cut_content, 700, encoding) if rough_cut_content else "No rough cut review yet.",
+        rough_cut_summary=_rough_cut_rows_summary(ss.get("ifs_rough_cut_timeline_rows", [])),
+        rough_cut_meta=_dumps_pretty(rough_cut_meta) if rough_cut_meta else "No metadata yet.",
+    )
+
+
+def _generate_all(ai_client: Any) -> None:
+    """Generate the script pack, shot grid, and edit notes concurrently, then the deck from them.
+
+    Workers only make the requests; session state is read before submitting and written here
+    on the script thread as each result comes back. A failed part is reported on its own and the
+    parts that finished are kept, but the deck is skipped so it is not built from stale inputs.
+    """
+    ss = st.session_state
+    project = ss["ifs_project_title"]
+    model = ss["ifs_model"].strip() or DEFAULT_CHAT_MODEL
+    temperature = float(ss["ifs_temperature"])
+    jobs = {
+        "Script": ("ifs_script_output", f"{project} script pack", _SCRIPT_SYS, _script_user_prompt()),
+        "Storyboard": ("ifs_storyboard_output", f"{project} shot grid", _STORY_SYS, _storyboard_user_prompt(ss["ifs_focus"])),
+        "Edit": ("ifs_edit_output", f"{project} edit notes", _EDIT_SYS, _edit_user_prompt()),
+    }
+
+    with st.status("Generating script, storyboard, and edit notes...", expanded=True) as progress:
+        pool = _generation_executor()
+        guard = _request_guard()
+        endpoint = _client_endpoint(ai_client)
+        futures = {}
+        for kind, (output_key, title, system_prompt, user_prompt) in jobs.items():
+            routed = _routed_model(model, user_prompt, guard)
+            cache_key = _prompt_cache_key(endpoint, routed, temperature, system_prompt, user_prompt)
+            cached = _cached_prompt_result(cache_key)
+            if cached is not None:
+                ss[output_key] = cached[0]
+                _save_history(kind, title, cached[0])
+                progress.write(f"{kind} ready (cached).")
+                continue
+            future = pool.submit(
+                _generate_text, ai_client, model, system_prompt, user_prompt, temperature, guard=guard
+            )
+            futures[future] = (kind, cache_key)
+
+        failures = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, cache_key = futures[future]
+                output_key, title = jobs[kind][:2]
+                try:
+                    content, status = future.result()
+                except RuntimeError as exc:
+                    failures.append(f"{kind} ({exc})")
+                    progress.write(f"{kind} failed: {exc}")
+                    continue
+                _remember_prompt_result(cache_key, content, status)
+                ss[output_key] = content
+                _save_history(kind, title, content)
+                progress.write(f"{kind} ready ({status}).")
+
+        if failures:
+            progress.update(label="Some outputs failed; director deck skipped.", state="error")
+            ss["ifs_status_line"] = f"Generate All kept the finished outputs; failed: {'; '.join(failures)}."
+            return
+
+        progress.update(label="Generating director deck...")
+        try:
+            content, status = _session_generate(ai_client, model, _DECK_SYS, _deck_user_prompt(), temperature)
+        except RuntimeError as exc:
+            progress.update(label="Director deck failed.", state="error")
+            ss["ifs_status_line"] = f"Script, storyboard, and edit notes generated; director deck failed ({exc})."
+            return
+        ss["ifs_deck_output"] = content
+        _save_history("Deck", f"{project} director deck", content)
+        progress.update(label="All outputs generated.", state="complete", expanded=False)
+
+    ss["ifs_status_line"] = f"Script, storyboard, edit notes, and director deck generated ({status})."
+
+
+def _generate_all_combined(ai_client: Any) -> None:
+    """Generate all four outputs with one request and split the reply on its `##` headings.
+
+    Sections the model leaves out keep their previous output.
+    """
+    ss = st.session_state
+    project = ss["ifs_project_title"]
+    model = ss["ifs_model"].strip() or DEFAULT_CHAT_MODEL
+    temperature = float(ss["ifs_temperature"])
+    user_prompt = _COMBINED_USER_TMPL.format(
+        script=_script_user_prompt(),
+        storyboard=_storyboard_user_prompt(ss["ifs_focus"]),
+        edit=_edit_user_prompt(),
+        brief=_build_director_brief(),
+    )
+
+    with st.status("Generating all outputs in one request...", expanded=True) as progress:
+        try:
+            content, status = _session_generate(
                 ai_client,
                 model,
-                system_prompt,
+                _COMBINED_SYS,
                 user_prompt,
                 temperature,
+                on_delta=_markdown_streamer(st.empty()),
             )
+        except RuntimeError as exc:
+            progress.update(label="Combined generation failed.", state="error")
+            ss["ifs_status_line"] = f"Combined generation failed; previous outputs were kept ({exc})."
+            return
+        sections = _split_h2_sections(content)
+        missing = []
+        for heading, output_key, kind, title in _COMBINED_SECTIONS:
+            section = sections.get(heading)
+            if not section:
+                missing.append(heading)
+                continue
+            ss[output_key] = section
+            _save_history(kind, f"{project} {title}", section)
+        progress.update(label="All outputs generated.", state="complete", expanded=False)
 
-        st.session_state["ifs_script_output"] = content
-        st.session_state["ifs_status_line"] = f"Script pack generated ({status})."
-        _save_history("Script", f"{project} script pack", content)
+    if missing:
+        ss["ifs_status_line"] = f"Combined generation ({status}) was missing: {', '.join(missing)}."
+    else:
+        ss["ifs_status_line"] = f"Script, storyboard, edit notes, and director deck generated in one request ({status})."
 
-    if st.session_state["ifs_script_output"]:
-        st.markdown(st.session_state["ifs_script_output"])
-        st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
-        st.download_button(
-            "Download Script Pack",
-            data=st.session_state["ifs_script_output"],
-            file_name="script_pack.md",
-            mime="text/markdown",
+
+def _sidebar_controls() -> None:
+    st.sidebar.markdown("## Advanced Settings")
+    st.sidebar.caption("The main page keeps the workflow simple. Open these only when you need extra control.")
+
+    with st.sidebar.expander("Look and pacing", expanded=False):
+        preset_names = [preset["name"] for preset in STYLE_PRESETS]
+        st.selectbox("Style preset", preset_names, key="ifs_preset")
+
+        preset_cols = st.columns(2)
+        preset_cols[0].button(
+            "Apply preset",
+            key="apply_preset",
+            use_container_width=True,
+            on_click=_apply_selected_preset,
+        )
+        preset_cols[1].button(
+            "Randomize",
+            key="random_profile",
             use_container_width=True,
-            key="dl_script",
+            on_click=_randomize_profile,
+        )
+
+        st.selectbox("Genre", GENRES, key="ifs_genre")
+        st.selectbox("Tone", TONES, key="ifs_tone")
+        st.selectbox("Camera style", CAMERA_STYLES, key="ifs_camera_style")
+        st.selectbox("Palette", PALETTES, key="ifs_palette")
+        st.selectbox("Focus area", FOCUS_AREAS, key="ifs_focus")
+        st.slider("Energy", 0, 100, key="ifs_energy")
+        st.slider("Pace", 0, 100, key="ifs_pace")
+        st.slider("Creativity", 0.1, 1.2, key="ifs_temperature")
+
+        active_preset = _preset_by_name(st.session_state["ifs_preset"])
+        st.caption(f"Preset: {active_preset['tagline']}")
+
+    with st.sidebar.expander("Model", expanded=False):
+        st.text_input("Model", key="ifs_model")
+        st.checkbox(
+            "Bypass cache",
+            key="ifs_cache_bypass",
+            help="Always send a fresh request, even when these exact inputs were already generated this session.",
+        )
+        st.checkbox(
+            "Generate All in one request",
+            key="ifs_generate_all_combined",
+            help=(
+                "Asks for all four outputs in a single prompt and splits the reply by section. "
+                "One round trip instead of four and the deck sees the model's own drafts, "
+                "but each section tends to be shorter and nothing finishes until the whole reply does."
+            ),
+        )
+        st.caption(
+            "Responses are also saved to a disk cache shared by everyone using this server, "
+            "so identical inputs can return another session's result. Use Bypass cache to avoid it."
+        )
+        st.button(
+            "Clear session cache",
+            key="clear_generation_cache",
+            on_click=_clear_session_cache,
+            help="Forget this session's saved responses. The shared disk cache is left alone, so use Bypass cache to force new output.",
+        )
+        if _shared_cache_clear_allowed():
+            st.button(
+                "Clear shared disk cache",
+                key="clear_shared_generation_cache",
+                on_click=_clear_shared_cache,
+                help="Deletes saved responses for every session on this server.",
+            )
+        if LIGHT_CHAT_MODEL:
+            st.checkbox(
+                f"Route short prompts to {LIGHT_CHAT_MODEL}",
+                key="ifs_auto_route",
+                help="Short requests without a scene excerpt use the light model while the Model field is left at its default.",
+            )
+            if _light_model_for_session():
+                st.caption(f"Short prompts currently go to `{LIGHT_CHAT_MODEL}`; longer ones to `{DEFAULT_CHAT_MODEL}`.")
+        st.slider("Request timeout (sec)", 5, 120, key="ifs_timeout")
+        st.text_input(
+            "Fallback model",
+            key="ifs_fallback_model",
+            help="Tried once when the main model times out. Leave blank to fail instead.",
+        )
+        breaker = st.session_state.get("ifs_breaker") or _new_breaker()
+        if breaker["degraded"]:
+            st.warning("The main model kept timing out, so requests go to the fallback model.")
+            st.button("Retry main model", key="reset_breaker", on_click=_reset_breaker)
+        elif breaker["last_seconds"] is not None:
+            st.caption(f"Last request took {breaker['last_seconds']:.1f}s.")
+        st.caption("Set `OPENAI_API_KEY` in Streamlit secrets or `.env` to run the app.")
+
+
+def _top_section(ai_client: Any) -> None:
+    concept = CONCEPT_SEEDS[st.session_state["ifs_concept_idx"]]
+    provider_chain = st.session_state.get("ifs_provider_chain") or _provider_chain_text(ai_client)
+    st.title("Infinity Film Studio")
+    st.caption("Simple workflow: set a project, write a premise, copy it to storyboard, then generate what you need with OpenAI.")
+
+    st.text_input("Project title", key="ifs_project_title")
+
+    ss = st.session_state
+    info_cols = st.columns(2)
+    info_cols[0].markdown(f"**Mode:** OpenAI API  \n**Provider:** `{provider_chain}`")
+    info_cols[1].markdown(
+        f"**Current style:** {ss['ifs_genre']} / {ss['ifs_tone']} / {ss['ifs_focus']}  \n"
+        f"**Camera / palette:** {ss['ifs_camera_style']} / {ss['ifs_palette']}"
+    )
+
+    st.markdown(f"**Starting concept**\n\n{concept}")
+
+    # Callbacks run before the next script run, so none of these need an explicit rerun.
+    action_cols = st.columns(3)
+    action_cols[0].button(
+        "Shuffle Concept",
+        key="shuffle_concept_top",
+        use_container_width=True,
+        on_click=_shuffle_concept,
+    )
+    action_cols[1].button(
+        "Load Concept into Script",
+        key="load_concept_script",
+        use_container_width=True,
+        on_click=_set_state_value,
+        args=("ifs_script_prompt", concept, "Active concept copied into the script premise."),
+    )
+    action_cols[2].button(
+        "Use Concept in Both",
+        key="sync_concept",
+        use_container_width=True,
+        on_click=_use_concept_everywhere,
+        args=(concept,),
+    )
+
+    st.info(f"Status: {st.session_state['ifs_status_line']}")
+
+
+@_fragment
+def _markdown_output(output_key: str, download_label: str, file_name: str, download_key: str) -> None:
+    """Render a generated markdown output with its download button.
+
+    Nested inside the tab fragment, so a download click reruns only this block instead of the tab.
+    """
+    content = st.session_state[output_key]
+    if not content:
+        return
+    st.markdown(content)
+    st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
+    st.download_button(
+        download_label,
+        data=content.encode("utf-8"),
+        file_name=file_name,
+        mime="text/markdown",
+        use_container_width=True,
+        key=download_key,
+    )
+
+
+def _store_script_result(project: str, content: str, status: str) -> None:
+    st.session_state["ifs_script_output"] = content
+    st.session_state["ifs_status_line"] = f"Script pack generated ({status})."
+    _save_history("Script", f"{project} script pack", content)
+
+
+@_fragment(run_every=0.5)
+def _script_pending_poller() -> None:
+    """Collect a background script generation once it finishes; polls while one is pending."""
+    pending = st.session_state.get("ifs_pending_script")
+    if pending is None:
+        return
+    future = pending["future"]
+    if not future.done() and _FRAGMENT_DECORATOR is not None:
+        partial = "".join(pending.get("chunks") or ())
+        if partial:
+            st.markdown(partial + " ▌")
+        else:
+            st.info("Generating script pack... the rest of the studio stays usable meanwhile.")
+        return
+
+    st.session_state.pop("ifs_pending_script", None)
+    try:
+        content, status = future.result()
+    except RuntimeError as exc:
+        st.session_state["ifs_status_line"] = f"Script pack generation failed ({exc})."
+        _rerun()
+        return
+    _remember_prompt_result(pending["cache_key"], content, status)
+    _store_script_result(pending["project"], content, status)
+    _rerun()
+
+
+@_fragment
+def _script_tab(ai_client: Any) -> None:
+    st.subheader("Script")
+    st.caption("Write a premise and generate a script pack.")
+
+    st.text_area("Scene premise", key="ifs_script_prompt", height=120)
+
+    script_premise = str(st.session_state["ifs_script_prompt"] or "").strip()
+    story_prompt = str(st.session_state["ifs_story_prompt"] or "").strip()
+    story_matches_script = bool(script_premise) and story_prompt == script_premise
+
+    script_pending = st.session_state.get("ifs_pending_script") is not None
+    controls = st.columns(3)
+    generate = controls[0].button(
+        "Generate Script Pack",
+        type="primary",
+        use_container_width=True,
+        disabled=script_pending,
+    )
+    if controls[1].button(
+        "Copy Premise to Storyboard",
+        key="push_story",
+        use_container_width=True,
+        help="Copies the current scene premise into the storyboard input. It does not generate a shot grid.",
+        on_click=_set_story_prompt,
+        args=(st.session_state["ifs_script_prompt"], "script", "Scene premise copied to storyboard input."),
+    ):
+        # The callback already updated state; refresh the whole page so the status line
+        # and the Storyboard tab (a separate fragment) show it.
+        _rerun()
+    if controls[2].button("Clear Script Output", key="clear_script", use_container_width=True):
+        st.session_state["ifs_script_output"] = ""
+        st.session_state["ifs_status_line"] = "Script output cleared."
+        _rerun()
+
+    if not script_premise:
+        st.caption("Add a scene premise above to generate a script pack or copy it into Storyboard.")
+    elif story_matches_script:
+        st.caption("Storyboard input already matches this scene premise. Open Storyboard and click Generate Shot Grid to create frames.")
+    else:
+        st.caption("Copy Premise to Storyboard only fills the storyboard input. Shot generation happens separately on the Storyboard tab.")
+
+    if generate:
+        project = st.session_state["ifs_project_title"]
+        model = st.session_state["ifs_model"].strip() or DEFAULT_CHAT_MODEL
+        temperature = float(st.session_state["ifs_temperature"])
+
+        system_prompt = _SCRIPT_SYS
+        user_prompt = _script_user_prompt()
+
+        guard = _request_guard()
+        cache_key = _prompt_cache_key(
+            _client_endpoint(ai_client), _routed_model(model, user_prompt, guard), temperature, system_prompt, user_prompt
         )
+        cached = _cached_prompt_result(cache_key)
+        if cached is not None:
+            _store_script_result(project, *cached)
+            _rerun()
+
+        # The request streams on a worker thread into `chunks`; `_script_pending_poller`
+        # shows the partial text and picks up the final result.
+        chunks: list[str] = []
+        future = _generation_executor().submit(
+            _generate_text,
+            ai_client,
+            model,
+            system_prompt,
+            user_prompt,
+            temperature,
+            chunks.append,
+            guard,
+        )
+        st.session_state["ifs_pending_script"] = {
+            "future": future,
+            "project": project,
+            "chunks": chunks,
+            "cache_key": cache_key,
+        }
+        script_pending = True
 
+    if script_pending:
+        _script_pending_poller()
 
+    _markdown_output("ifs_script_output", "Download Script Pack", "script_pack.md", "dl_script")
+
+
+@_fragment
 def _storyboard_tab(ai_client: Any) -> None:
     st.subheader("Storyboard")
     st.caption("Turn one moment into a simple shot list.")
@@ -1887,26 +3118,34 @@ def _storyboard_tab(ai_client: Any) -> None:
     guidance_type, guidance_text = _story_prompt_guidance()
     getattr(st, guidance_type)(guidance_text)
 
-    st.text_area("Moment to storyboard", key="ifs_story_prompt", height=110)
-    st.slider("Frames", 4, 12, key="ifs_frame_count")
+    # Inputs only reach the script when Generate Shot Grid is pressed, so typing or
+    # dragging the frame slider does not rerun the tab.
+    with st.form("storyboard_settings", border=False):
+        st.text_area("Moment to storyboard", key="ifs_story_prompt", height=110)
+        input_cols = st.columns(2)
+        input_cols[0].slider("Frames", 4, 12, key="ifs_frame_count")
+        focus_override = input_cols[1].selectbox(
+            "Shot Focus", FOCUS_AREAS, index=_FOCUS_INDEX.get(st.session_state["ifs_focus"], 0)
+        )
+        generate = st.form_submit_button("Generate Shot Grid", type="primary", use_container_width=True)
 
     script_premise = str(st.session_state["ifs_script_prompt"] or "").strip()
     story_prompt = str(st.session_state["ifs_story_prompt"] or "").strip()
     story_matches_script = bool(script_premise) and story_prompt == script_premise
     copy_label = "Storyboard Already Matches Script" if story_matches_script else "Copy Current Script Premise"
 
-    col_a, col_b, col_c = st.columns(3)
-    if col_a.button(
+    if st.button(
         copy_label,
         key="use_script_premise",
         use_container_width=True,
         disabled=not script_premise or story_matches_script,
         help="Copies the current scene premise from Script Copilot into the storyboard input above. It does not generate frames.",
+        on_click=_set_story_prompt,
+        args=(st.session_state["ifs_script_prompt"], "script", "Storyboard input replaced with the current script premise."),
     ):
-        _set_story_prompt(st.session_state["ifs_script_prompt"], "script", "Storyboard input replaced with the current script premise.")
+        # `ifs_story_prompt` is bound to the text area above, so it can only be set from the
+        # callback; the full rerun refreshes the status line outside this fragment.
         _rerun()
-    focus_override = col_b.selectbox("Shot Focus", FOCUS_AREAS, index=FOCUS_AREAS.index(st.session_state["ifs_focus"]))
-    generate = col_c.button("Generate Shot Grid", type="primary", use_container_width=True)
 
     if not script_premise:
         st.caption("No script premise is available to copy yet. Write one in Script Copilot first.")
@@ -1917,119 +3156,149 @@ def _storyboard_tab(ai_client: Any) -> None:
 
     if generate:
         project = st.session_state["ifs_project_title"]
-        tone = st.session_state["ifs_tone"]
-        style = st.session_state["ifs_camera_style"]
-        palette = st.session_state["ifs_palette"]
-        frame_count = int(st.session_state["ifs_frame_count"])
         model = st.session_state["ifs_model"].strip() or DEFAULT_CHAT_MODEL
-        scene = st.session_state["ifs_story_prompt"]
         temperature = float(st.session_state["ifs_temperature"])
 
-        system_prompt = (
-            "You are a storyboard supervisor. Return practical, production-ready frame plans. "
-            "Use markdown table format and include continuity guardrails."
+        system_prompt = _STORY_SYS
+        user_prompt = _storyboard_user_prompt(focus_override)
+
+        stream_box = st.empty()
+        stream_box.caption("Generating storyboard...")
+        content, status = _session_generate(
+            ai_client,
+            model,
+            system_prompt,
+            user_prompt,
+            temperature,
+            on_delta=_markdown_streamer(stream_box),
         )
-        user_prompt = textwrap.dedent(
-            f"""
-            Project title: {project}
-            Tone: {tone}
-            Camera style: {style}
-            Palette: {palette}
-            Focus area: {focus_override}
-            Scene moment: {scene}
-            Frame count: {frame_count}
-
-            Output:
-            - Markdown table with columns: Frame, Camera, Visual, Sound
-            - Then 3 continuity guardrails as bullets
-            """
-        ).strip()
-
-        with st.spinner("Generating storyboard..."):
-            content, status = _generate_text(
-                ai_client,
-                model,
-                system_prompt,
-                user_prompt,
-                temperature,
-            )
 
         st.session_state["ifs_storyboard_output"] = content
         st.session_state["ifs_status_line"] = f"Storyboard generated ({status})."
         _save_history("Storyboard", f"{project} shot grid", content)
+        _rerun()
 
-    if st.session_state["ifs_storyboard_output"]:
-        st.markdown(st.session_state["ifs_storyboard_output"])
-        st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
+    _markdown_output("ifs_storyboard_output", "Download Storyboard", "storyboard.md", "dl_story")
+
+
+@_fragment
+def _edit_outputs() -> None:
+    """Timeline flags, edit notes, and rough-cut review with their exports (nested fragment, see `_markdown_output`)."""
+    if st.session_state["ifs_rough_cut_timeline_rows"]:
+        st.markdown("#### Timeline Flags")
+        st.caption("Structured timestamped notes generated for the rough-cut pass (downloadable as CSV/JSON).")
+        rows = st.session_state["ifs_rough_cut_timeline_rows"]
+        priority_counts = Counter(_row_field(row, "priority") for row in rows)
+        count_high = priority_counts["High"]
+        count_medium = priority_counts["Medium"]
+        count_low = priority_counts["Low"]
+        st.markdown(
+            _metric_grid_html(
+                [
+                    ("Flags", str(len(rows))),
+                    ("High", str(count_high)),
+                    ("Medium", str(count_medium)),
+                    ("Low", str(count_low)),
+                ]
+            ),
+            unsafe_allow_html=True,
+        )
+        st.caption(_rough_cut_rows_summary(rows))
+        display_frame = st.session_state.get("ifs_rough_cut_timeline_df")
+        if display_frame is None:
+            display_frame = _rough_cut_display_frame(rows)
+            st.session_state["ifs_rough_cut_timeline_df"] = display_frame
+        try:
+            st.dataframe(display_frame, use_container_width=True, hide_index=True)
+        except Exception:
+            st.json(display_frame.to_dict(orient="records"), expanded=False)
+
+    if st.session_state["ifs_edit_output"]:
+        st.markdown("#### Edit Notes")
+        st.markdown(st.session_state["ifs_edit_output"])
         st.download_button(
-            "Download Storyboard",
-            data=st.session_state["ifs_storyboard_output"],
-            file_name="storyboard.md",
+            "Download Edit Notes",
+            data=st.session_state["ifs_edit_output"].encode("utf-8"),
+            file_name="edit_notes.md",
+            mime="text/markdown",
+            use_container_width=True,
+            key="dl_edit",
+        )
+        st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
+
+    if st.session_state["ifs_rough_cut_output"]:
+        st.markdown("#### Rough Cut Analysis")
+        st.markdown(st.session_state["ifs_rough_cut_output"])
+        export_cols = st.columns(3)
+        export_cols[0].download_button(
+            "Download Rough Cut Review",
+            data=st.session_state["ifs_rough_cut_output"].encode("utf-8"),
+            file_name="rough_cut_review.md",
             mime="text/markdown",
             use_container_width=True,
-            key="dl_story",
+            key="dl_rough_cut_review",
         )
+        timeline_rows = st.session_state.get("ifs_rough_cut_timeline_rows") or []
+        if timeline_rows:
+            rows_key = _rough_cut_rows_key(timeline_rows)
+            export_cols[1].download_button(
+                "Download Timeline CSV",
+                data=_rough_cut_csv_export(rows_key),
+                file_name="rough_cut_timeline.csv",
+                mime="text/csv",
+                use_container_width=True,
+                key="dl_cut_csv",
+            )
+            export_cols[2].download_button(
+                "Download Timeline JSON",
+                data=_rough_cut_json_export(rows_key),
+                file_name="rough_cut_timeline.json",
+                mime="application/json",
+                use_container_width=True,
+                key="dl_cut_json",
+            )
+        st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
 
 
+@_fragment
 def _edit_tab(ai_client: Any) -> None:
     st.subheader("Edit Review")
     st.caption("Generate standard edit notes or upload a rough cut for timestamped review.")
 
-    settings_col, rough_cut_col = st.columns([1.05, 1.15], gap="large")
-
-    with settings_col:
-        pacing = st.selectbox("Pacing profile", ["Fast", "Balanced", "Slow burn"], index=1)
-        runtime_target = st.slider("Target runtime (minutes)", 3, 40, 12)
-        st.text_input("Primary objective", key="ifs_edit_objective")
-        issues = st.multiselect("Current issues", ISSUE_FLAGS, default=["Too slow in middle"])
-
-    clip_bytes = b""
+    clip_path = ""
+    clip_size = 0
     clip_name = ""
     clip_type = ""
     clip_meta: dict[str, Any] = {}
 
-    with rough_cut_col:
-        st.markdown("#### Rough Cut Analyzer")
-        st.caption("Upload a clip and generate timestamped cut notes you can act on immediately.")
+    st.markdown("#### Rough Cut Analyzer")
+    st.caption("Upload a clip and generate timestamped cut notes you can act on immediately.")
+    upload_col, clip_col = st.columns([1.05, 1.15], gap="large")
+    with upload_col:
+        # Kept outside the settings form so a new upload is spooled and probed right away.
         uploaded_video = st.file_uploader(
             "Upload rough cut (mp4/mov/webm/mkv)",
             type=["mp4", "mov", "m4v", "webm", "mkv", "avi"],
             key="ifs_rough_cut_file",
             help="The app uses local metadata probing when available and builds a timestamped review.",
         )
-        st.text_area(
-            "Transcript / shot notes (optional)",
-            key="ifs_rough_cut_notes",
-            height=120,
-            help="Paste transcript, shot notes, or editor observations to improve cut recommendations.",
-        )
-        st.text_input(
-            "Review question (optional)",
-            key="ifs_rough_cut_question",
-            help="Example: Where does pacing drop, and what should I trim first?",
-        )
-        cut_cfg_a, cut_cfg_b = st.columns(2)
-        cut_cfg_a.number_input(
-            "Clip duration fallback (sec)",
-            min_value=4,
-            max_value=7200,
-            step=1,
-            key="ifs_clip_duration_guess_seconds",
-            help="Used when ffprobe metadata is unavailable.",
-        )
-        cut_cfg_b.slider(
-            "Segment size (sec)",
-            min_value=5,
-            max_value=90,
-            key="ifs_cut_segment_seconds",
-            help="Smaller segments produce more granular timestamp notes.",
-        )
 
-        if uploaded_video is not None:
-            clip_bytes = uploaded_video.getvalue()
+    with clip_col:
+        if uploaded_video is None:
+            _discard_upload_spool()
+        else:
+            spool = _spooled_upload(uploaded_video)
+            clip_path = spool["path"]
+            clip_size = int(spool["size"])
             clip_name = uploaded_video.name
             clip_type = uploaded_video.type or ""
-            clip_meta = _probe_video_metadata(clip_name, clip_bytes)
+            # Probe once per upload; later reruns for the same file_id reuse the stored result.
+            if spool.get("meta") is None:
+                if _is_probeable_video(clip_name, clip_type):
+                    spool["meta"] = _probe_video_metadata_cached(spool["file_id"], clip_name, clip_size, clip_path)
+                else:
+                    spool["meta"] = _empty_clip_metadata(clip_name, clip_size, "skipped_non_video")
+            clip_meta = dict(spool["meta"])
 
             detected_duration = _safe_float(clip_meta.get("duration_seconds"))
             clip_len_label = (
@@ -2043,123 +3312,143 @@ def _edit_tab(ai_client: Any) -> None:
                 else "Unknown"
             )
 
-            meta_cols = st.columns(4)
-            meta_cols[0].metric("Clip Length", clip_len_label)
-            meta_cols[1].metric("File Size", _format_bytes(len(clip_bytes)))
-            meta_cols[2].metric("Resolution", res_label)
-            meta_cols[3].metric(
-                "FPS",
-                f"{clip_meta['fps']:.2f}" if isinstance(clip_meta.get("fps"), (int, float)) else "Unknown",
+            fps_label = f"{clip_meta['fps']:.2f}" if isinstance(clip_meta.get("fps"), (int, float)) else "Unknown"
+            st.markdown(
+                _metric_grid_html(
+                    [
+                        ("Clip Length", clip_len_label),
+                        ("File Size", _format_bytes(clip_size)),
+                        ("Resolution", res_label),
+                        ("FPS", fps_label),
+                    ]
+                ),
+                unsafe_allow_html=True,
             )
 
             if clip_meta.get("probe_status") == "ffprobe_not_installed":
                 st.info("`ffprobe` is not installed locally. Using manual duration fallback for timeline segmentation.")
             elif clip_meta.get("probe_status") == "ffprobe_failed":
                 st.info("Video metadata probe failed. Timestamp analysis will use the fallback duration you set.")
+            elif clip_meta.get("probe_status") == "skipped_non_video":
+                st.info("This upload does not look like a video file, so metadata probing was skipped.")
 
-            with st.expander("Preview uploaded rough cut", expanded=False):
-                st.video(clip_bytes)
-                st.caption(
-                    f"File: {clip_name} • MIME: {clip_type or 'unknown'} • Probe: {clip_meta.get('probe_status', 'unknown')}"
-                )
+            st.caption(
+                f"File: {clip_name} • MIME: {clip_type or 'unknown'} • Probe: {clip_meta.get('probe_status', 'unknown')}"
+            )
+            # st.video reads the whole file into the media manager even inside a collapsed
+            # expander, so only hand it the spooled path once the preview is switched on.
+            if st.toggle("Preview uploaded rough cut", key="ifs_rough_cut_preview"):
+                st.video(clip_path)
+
+    # Settings only reach the script when one of the submit buttons is pressed,
+    # so dragging a slider or editing notes does not rerun the tab.
+    with st.form("edit_settings", clear_on_submit=False, border=False):
+        settings_col, rough_cut_col = st.columns([1.05, 1.15], gap="large")
+
+        with settings_col:
+            pacing = st.selectbox("Pacing profile", PACING_PROFILES, key="ifs_edit_pacing")
+            runtime_target = st.slider("Target runtime (minutes)", 3, 40, key="ifs_edit_runtime_target")
+            st.text_input("Primary objective", key="ifs_edit_objective")
+            issues = st.multiselect("Current issues", ISSUE_FLAGS, key="ifs_edit_issues")
+
+        with rough_cut_col:
+            st.text_area(
+                "Transcript / shot notes (optional)",
+                key="ifs_rough_cut_notes",
+                height=120,
+                help="Paste transcript, shot notes, or editor observations to improve cut recommendations.",
+            )
+            st.text_input(
+                "Review question (optional)",
+                key="ifs_rough_cut_question",
+                help="Example: Where does pacing drop, and what should I trim first?",
+            )
+            cut_cfg_a, cut_cfg_b = st.columns(2)
+            cut_cfg_a.number_input(
+                "Clip duration fallback (sec)",
+                min_value=4,
+                max_value=7200,
+                step=1,
+                key="ifs_clip_duration_guess_seconds",
+                help="Used when ffprobe metadata is unavailable.",
+            )
+            cut_cfg_b.slider(
+                "Segment size (sec)",
+                min_value=5,
+                max_value=90,
+                key="ifs_cut_segment_seconds",
+                help="Smaller segments produce more granular timestamp notes.",
+            )
 
-    controls = st.columns(3)
-    generate = controls[0].button("Generate Edit Notes", use_container_width=True)
-    analyze_cut = controls[1].button("Analyze Rough Cut", type="primary", use_container_width=True)
-    if controls[2].button("Clear Edit Output", key="clear_edit", use_container_width=True):
+        submit_cols = st.columns(2)
+        generate = submit_cols[0].form_submit_button("Generate Edit Notes", use_container_width=True)
+        analyze_cut = submit_cols[1].form_submit_button(
+            "Analyze Rough Cut", type="primary", use_container_width=True
+        )
+
+    if st.button("Clear Edit Output", key="clear_edit", use_container_width=True):
         st.session_state["ifs_edit_output"] = ""
         st.session_state["ifs_rough_cut_output"] = ""
         st.session_state["ifs_rough_cut_timeline_rows"] = []
-        st.session_state["ifs_rough_cut_timeline_csv"] = ""
-        st.session_state["ifs_rough_cut_timeline_json"] = ""
         st.session_state["ifs_rough_cut_metadata"] = {}
+        st.session_state["ifs_rough_cut_timeline_df"] = None
         st.session_state["ifs_status_line"] = "Edit output cleared."
         _rerun()
 
     if generate:
-        project = st.session_state["ifs_project_title"]
-        tone = st.session_state["ifs_tone"]
-        focus = st.session_state["ifs_focus"]
-        objective = st.session_state["ifs_edit_objective"]
-        energy = st.session_state["ifs_energy"]
-        pace = st.session_state["ifs_pace"]
-        model = st.session_state["ifs_model"].strip() or DEFAULT_CHAT_MODEL
-        temperature = float(st.session_state["ifs_temperature"])
-
-        system_prompt = (
-            "You are a senior film editor. Provide concise, high-leverage feedback that is immediately "
-            "actionable in an editing suite."
+        ss = st.session_state
+        project = ss["ifs_project_title"]
+        model = ss["ifs_model"].strip() or DEFAULT_CHAT_MODEL
+        temperature = float(ss["ifs_temperature"])
+
+        system_prompt = _EDIT_SYS
+        user_prompt = _edit_user_prompt()
+
+        stream_box = st.empty()
+        stream_box.caption("Generating edit notes...")
+        content, status = _session_generate(
+            ai_client,
+            model,
+            system_prompt,
+            user_prompt,
+            temperature,
+            on_delta=_markdown_streamer(stream_box),
         )
-        user_prompt = textwrap.dedent(
-            f"""
-            Project title: {project}
-            Tone: {tone}
-            Pacing profile: {pacing}
-            Runtime target: {runtime_target} minutes
-            Objective: {objective}
-            Focus area: {focus}
-            Energy: {energy}/100
-            Pace: {pace}/100
-            Issues: {', '.join(issues) if issues else 'none'}
-
-            Output:
-            - Prioritized numbered edit notes
-            - End with a short Priority section (High/Medium/Finish)
-            """
-        ).strip()
-
-        with st.spinner("Generating edit notes..."):
-            content, status = _generate_text(
-                ai_client,
-                model,
-                system_prompt,
-                user_prompt,
-                temperature,
-            )
 
-        st.session_state["ifs_edit_output"] = content
-        st.session_state["ifs_status_line"] = f"Edit notes generated ({status})."
+        ss["ifs_edit_output"] = content
+        ss["ifs_status_line"] = f"Edit notes generated ({status})."
         _save_history("Edit", f"{project} edit notes", content)
+        _rerun()
 
     if analyze_cut:
-        project = st.session_state["ifs_project_title"]
-        tone = st.session_state["ifs_tone"]
-        focus = st.session_state["ifs_focus"]
-        objective = st.session_state["ifs_edit_objective"]
-        energy = int(st.session_state["ifs_energy"])
-        pace = int(st.session_state["ifs_pace"])
-        model = st.session_state["ifs_model"].strip() or DEFAULT_CHAT_MODEL
-        temperature = float(st.session_state["ifs_temperature"])
-        cut_notes = st.session_state["ifs_rough_cut_notes"]
-        review_question = st.session_state["ifs_rough_cut_question"].strip()
-        segment_seconds = int(st.session_state["ifs_cut_segment_seconds"])
-        fallback_duration_seconds = int(st.session_state["ifs_clip_duration_guess_seconds"])
-
-        if not clip_bytes and not cut_notes.strip():
+        ss = st.session_state
+        project = ss["ifs_project_title"]
+        tone = ss["ifs_tone"]
+        focus = ss["ifs_focus"]
+        objective = ss["ifs_edit_objective"]
+        energy = int(ss["ifs_energy"])
+        pace = int(ss["ifs_pace"])
+        model = ss["ifs_model"].strip() or DEFAULT_CHAT_MODEL
+        temperature = float(ss["ifs_temperature"])
+        cut_notes = ss["ifs_rough_cut_notes"]
+        review_question = ss["ifs_rough_cut_question"].strip()
+        segment_seconds = int(ss["ifs_cut_segment_seconds"])
+        fallback_duration_seconds = int(ss["ifs_clip_duration_guess_seconds"])
+
+        if not clip_path and not cut_notes.strip():
             st.warning("Upload a rough cut or paste transcript/shot notes to run timestamped analysis.")
         else:
             if not clip_meta:
-                clip_meta = {
-                    "file_name": clip_name or "rough-cut",
-                    "file_size_bytes": len(clip_bytes),
-                    "duration_seconds": None,
-                    "width": None,
-                    "height": None,
-                    "fps": None,
-                    "video_codec": None,
-                    "audio_codec": None,
-                    "bitrate_kbps": None,
-                    "probe_status": "not_probed",
-                }
+                clip_meta = _empty_clip_metadata(clip_name, clip_size, "not_probed")
             clip_meta["file_name"] = clip_name or clip_meta.get("file_name") or "rough-cut"
-            clip_meta["file_size_bytes"] = len(clip_bytes)
+            clip_meta["file_size_bytes"] = clip_size
 
             duration_seconds = _normalize_clip_duration_seconds(clip_meta, fallback_duration_seconds)
             rows = _fallback_rough_cut_rows(
                 project=project,
                 objective=objective,
                 pacing=pacing,
-                issues=issues,
+                issues=tuple(issues),
                 tone=tone,
                 focus=focus,
                 energy=energy,
@@ -2169,8 +3458,10 @@ def _edit_tab(ai_client: Any) -> None:
                 notes=cut_notes,
                 file_name=clip_name or "rough-cut",
             )
-            segment_preview = ", ".join(row["timestamp"] for row in rows[:8])
-            transcript_excerpt = cut_notes.strip()[:3000] if cut_notes.strip() else "No transcript/notes provided."
+            segment_preview = ", ".join(row.timestamp for row in islice(rows, 8))
+            # Cap before stripping so a multi-MB paste is never scanned end to end.
+            transcript_head = cut_notes[:4096].lstrip()
+            transcript_excerpt = transcript_head[:3000].rstrip() or "No transcript/notes provided."
             metadata_summary = {
                 "file_name": clip_meta.get("file_name") or "rough-cut",
                 "file_size_bytes": clip_meta.get("file_size_bytes"),
@@ -2184,220 +3475,96 @@ def _edit_tab(ai_client: Any) -> None:
                 "bitrate_kbps": clip_meta.get("bitrate_kbps"),
             }
 
-            system_prompt = (
-                "You are a senior film editor reviewing a rough cut. Produce timestamped, production-ready notes "
-                "that improve pacing, clarity, geography, and emotional impact. Return markdown only."
+            system_prompt = _ROUGH_CUT_SYS
+            user_prompt = _ROUGH_CUT_USER_TMPL.format(
+                project=project,
+                tone=tone,
+                pacing=pacing,
+                runtime_target=runtime_target,
+                objective=objective,
+                focus=focus,
+                energy=energy,
+                pace=pace,
+                issues=", ".join(issues) if issues else "none",
+                review_question=review_question or "General rough-cut pass",
+                metadata_json=_dumps_pretty(metadata_summary),
+                segment_preview=segment_preview,
+                transcript_excerpt=transcript_excerpt,
             )
-            user_prompt = textwrap.dedent(
-                f"""
-                Project title: {project}
-                Tone: {tone}
-                Pacing profile: {pacing}
-                Runtime target: {runtime_target} minutes
-                Objective: {objective}
-                Focus area: {focus}
-                Energy: {energy}/100
-                Pace: {pace}/100
-                Current issues: {', '.join(issues) if issues else 'none'}
-                Review question: {review_question or 'General rough-cut pass'}
-
-                Clip metadata (JSON):
-                {json.dumps(metadata_summary, indent=2)}
-
-                Timeline segments under review:
-                {segment_preview}
-
-                Transcript / shot notes (may be partial):
-                {transcript_excerpt}
-
-                Required output format:
-                1) "Rough Cut Snapshot" bullets
-                2) "Timestamped Cut Notes" markdown table with columns:
-                   Time | Priority | Focus | Issue | Observation | Recommended Cut
-                3) "Pattern Diagnosis" bullets
-                4) "First Pass Fix Order" numbered list
-
-                Keep recommendations concrete (frame trims, cut timing, inserts, L-cuts/J-cuts, reaction holds).
-                """
-            ).strip()
-
-            with st.spinner("Analyzing rough cut timeline..."):
-                content, status = _generate_text(
-                    ai_client,
-                    model,
-                    system_prompt,
-                    user_prompt,
-                    temperature,
-                )
 
-            st.session_state["ifs_rough_cut_output"] = content
-            st.session_state["ifs_rough_cut_timeline_rows"] = rows
-            st.session_state["ifs_rough_cut_timeline_csv"] = _rough_cut_rows_to_csv(rows)
-            st.session_state["ifs_rough_cut_timeline_json"] = json.dumps(rows, indent=2)
-            st.session_state["ifs_rough_cut_metadata"] = metadata_summary
-            st.session_state["ifs_status_line"] = f"Rough cut analysis generated ({status})."
-            _save_history("Rough Cut", f"{project} timestamped review", content)
-
-    if st.session_state["ifs_rough_cut_timeline_rows"]:
-        st.markdown("#### Timeline Flags")
-        st.caption("Structured timestamped notes generated for the rough-cut pass (downloadable as CSV/JSON).")
-        rows = st.session_state["ifs_rough_cut_timeline_rows"]
-        count_high = sum(1 for row in rows if row.get("priority") == "High")
-        count_medium = sum(1 for row in rows if row.get("priority") == "Medium")
-        count_low = sum(1 for row in rows if row.get("priority") == "Low")
-        sum_cols = st.columns(4)
-        sum_cols[0].metric("Flags", str(len(rows)))
-        sum_cols[1].metric("High", str(count_high))
-        sum_cols[2].metric("Medium", str(count_medium))
-        sum_cols[3].metric("Low", str(count_low))
-        st.caption(_rough_cut_rows_summary(rows))
-        display_rows = [
-            {
-                "Time": row.get("timestamp", ""),
-                "Priority": row.get("priority", ""),
-                "Focus": row.get("focus", ""),
-                "Issue": row.get("issue", ""),
-                "Observation": row.get("observation", ""),
-                "Recommended Cut": row.get("action", ""),
-            }
-            for row in rows
-        ]
-        try:
-            st.dataframe(display_rows, use_container_width=True, hide_index=True)
-        except Exception:
-            st.json(display_rows, expanded=False)
+            stream_box = st.empty()
+            stream_box.caption("Analyzing rough cut timeline...")
+            content, status = _session_generate(
+                ai_client,
+                model,
+                system_prompt,
+                user_prompt,
+                temperature,
+                on_delta=_markdown_streamer(stream_box),
+            )
 
-    if st.session_state["ifs_edit_output"]:
-        st.markdown("#### Edit Notes")
-        st.markdown(st.session_state["ifs_edit_output"])
-        st.download_button(
-            "Download Edit Notes",
-            data=st.session_state["ifs_edit_output"],
-            file_name="edit_notes.md",
-            mime="text/markdown",
-            use_container_width=True,
-            key="dl_edit",
-        )
-        st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
+            ss["ifs_rough_cut_output"] = content
+            ss["ifs_rough_cut_timeline_rows"] = rows
+            ss["ifs_rough_cut_timeline_df"] = _rough_cut_display_frame(rows)
+            ss["ifs_rough_cut_metadata"] = metadata_summary
+            ss["ifs_status_line"] = f"Rough cut analysis generated ({status})."
+            _save_history("Rough Cut", f"{project} timestamped review", content)
+            _rerun()
 
-    if st.session_state["ifs_rough_cut_output"]:
-        st.markdown("#### Rough Cut Analysis")
-        st.markdown(st.session_state["ifs_rough_cut_output"])
-        export_cols = st.columns(3)
-        export_cols[0].download_button(
-            "Download Rough Cut Review",
-            data=st.session_state["ifs_rough_cut_output"],
-            file_name="rough_cut_review.md",
-            mime="text/markdown",
-            use_container_width=True,
-            key="dl_rough_cut_review",
-        )
-        if st.session_state["ifs_rough_cut_timeline_csv"]:
-            export_cols[1].download_button(
-                "Download Timeline CSV",
-                data=st.session_state["ifs_rough_cut_timeline_csv"],
-                file_name="rough_cut_timeline.csv",
-                mime="text/csv",
-                use_container_width=True,
-                key="dl_cut_csv",
-            )
-        if st.session_state["ifs_rough_cut_timeline_json"]:
-            export_cols[2].download_button(
-                "Download Timeline JSON",
-                data=st.session_state["ifs_rough_cut_timeline_json"],
-                file_name="rough_cut_timeline.json",
-                mime="application/json",
-                use_container_width=True,
-                key="dl_cut_json",
-            )
-        st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
+    _edit_outputs()
 
 
+@_fragment
 def _deck_tab(ai_client: Any) -> None:
     st.subheader("Director Deck")
     st.caption("Synthesize script, storyboard, and edit strategy into one production brief.")
 
-    col_a, col_b = st.columns(2)
+    col_a, col_b, col_c = st.columns(3)
     generate = col_a.button("Generate Director Deck", type="primary", use_container_width=True)
-    if col_b.button("Clear Deck", key="clear_deck", use_container_width=True):
+    generate_all = col_b.button(
+        "Generate All",
+        key="generate_all",
+        use_container_width=True,
+        disabled=st.session_state.get("ifs_pending_script") is not None,
+        help="Regenerates the script pack, shot grid, and edit notes side by side, then builds the deck from them.",
+    )
+    if col_c.button("Clear Deck", key="clear_deck", use_container_width=True):
         st.session_state["ifs_deck_output"] = ""
         st.session_state["ifs_status_line"] = "Director deck cleared."
         _rerun()
 
+    if generate_all:
+        if st.session_state["ifs_generate_all_combined"]:
+            _generate_all_combined(ai_client)
+        else:
+            _generate_all(ai_client)
+        _rerun()
+
     if generate:
         project = st.session_state["ifs_project_title"]
         model = st.session_state["ifs_model"].strip() or DEFAULT_CHAT_MODEL
         temperature = float(st.session_state["ifs_temperature"])
-        brief = _build_director_brief()
-
-        script_content = st.session_state["ifs_script_output"]
-        storyboard_content = st.session_state["ifs_storyboard_output"]
-        edit_content = st.session_state["ifs_edit_output"]
-        rough_cut_content = st.session_state.get("ifs_rough_cut_output", "")
-        rough_cut_rows = st.session_state.get("ifs_rough_cut_timeline_rows", [])
-        rough_cut_meta = st.session_state.get("ifs_rough_cut_metadata", {})
-        rough_cut_summary = _rough_cut_rows_summary(rough_cut_rows)
-
-        system_prompt = (
-            "You are an executive creative producer. Build a concise production deck summary "
-            "for a director and team kickoff meeting."
-        )
-        user_prompt = textwrap.dedent(
-            f"""
-            Project: {project}
-            Director brief: {brief}
-
-            Script pack:
-            {script_content[:2200] if script_content else 'No script pack yet.'}
-
-            Storyboard:
-            {storyboard_content[:2200] if storyboard_content else 'No storyboard yet.'}
 
-            Edit notes:
-            {edit_content[:2200] if edit_content else 'No edit notes yet.'}
-
-            Rough cut review:
-            {rough_cut_content[:2800] if rough_cut_content else 'No rough cut review yet.'}
-
-            Rough cut timeline summary:
-            {rough_cut_summary}
-
-            Rough cut metadata (JSON):
-            {json.dumps(rough_cut_meta, indent=2) if rough_cut_meta else 'No metadata yet.'}
-
-            Create markdown with sections:
-            - Executive Summary
-            - What Is Locked
-            - What Needs Decisions
-            - Production Risks
-            - Next 5 Actions
-            """
-        ).strip()
-
-        with st.spinner("Generating director deck..."):
-            content, status = _generate_text(
-                ai_client,
-                model,
-                system_prompt,
-                user_prompt,
-                temperature,
-            )
+        system_prompt = _DECK_SYS
+        user_prompt = _deck_user_prompt()
+
+        stream_box = st.empty()
+        stream_box.caption("Generating director deck...")
+        content, status = _session_generate(
+            ai_client,
+            model,
+            system_prompt,
+            user_prompt,
+            temperature,
+            on_delta=_markdown_streamer(stream_box),
+        )
 
         st.session_state["ifs_deck_output"] = content
         st.session_state["ifs_status_line"] = f"Director deck generated ({status})."
         _save_history("Deck", f"{project} director deck", content)
+        _rerun()
 
-    if st.session_state["ifs_deck_output"]:
-        st.markdown(st.session_state["ifs_deck_output"])
-        st.markdown("<div class='export-row'></div>", unsafe_allow_html=True)
-        st.download_button(
-            "Download Director Deck",
-            data=st.session_state["ifs_deck_output"],
-            file_name="director_deck.md",
-            mime="text/markdown",
-            use_container_width=True,
-            key="dl_deck",
-        )
+    _markdown_output("ifs_deck_output", "Download Director Deck", "director_deck.md", "dl_deck")
 
 
 def _workspace_tab() -> None:
@@ -2681,45 +3848,58 @@ def _workspace_tab() -> None:
 
 def _history_tab() -> None:
     st.subheader("Recent Generations")
-    st.caption("Latest outputs from this session. You can restore prompts directly.")
+    st.caption(
+        f"The latest {HISTORY_LIMIT} outputs from this session; older ones drop off as new ones arrive. "
+        "You can restore prompts directly."
+    )
 
     history = st.session_state["ifs_history"]
     if not history:
         st.info("No generations yet. Create a script pack, shot grid, edit notes, or deck first.")
         return
 
-    for index, item in enumerate(history):
-        preview = item["content"][:280].replace("\n", " ").strip()
-        st.markdown(
-            f"""
-            <div class="history-item">
-              <h5>[{html.escape(item['kind'])}] {html.escape(item['title'])}</h5>
-              <p>{html.escape(item['time'])}</p>
-              <p>{html.escape(preview)}...</p>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
+    for item in history:
+        if "preview_html" not in item:
+            _escape_history_item(item)
+        # Items restored from workspaces saved before ids existed get one here.
+        item.setdefault("id", uuid.uuid4().hex)
+    st.markdown("\n".join(_HISTORY_CARD_TMPL.format_map(item) for item in history), unsafe_allow_html=True)
+
+    # The pick is keyed on the item id, so new generations pushed onto the front of the
+    # history do not shift the selection to another item.
+    items_by_id = {item["id"]: item for item in history}
+    if st.session_state.get("ifs_history_pick") not in items_by_id:
+        st.session_state["ifs_history_pick"] = next(iter(items_by_id))
+    item_id = st.selectbox(
+        "History item",
+        options=list(items_by_id),
+        format_func=lambda i: f"[{items_by_id[i]['kind']}] {items_by_id[i]['title']} - {items_by_id[i]['time']}",
+        key="ifs_history_pick",
+    )
+    item = items_by_id[item_id]
 
-        btn_a, btn_b, btn_c = st.columns(3)
-        btn_a.button(
-            "Copy to Script Premise",
-            key=f"hist_script_{index}",
-            use_container_width=True,
-            on_click=_set_state_value,
-            args=("ifs_script_prompt", item["content"][:700], "History item loaded into script premise."),
-        )
-        btn_b.button(
-            "Copy to Storyboard Input",
-            key=f"hist_story_{index}",
-            use_container_width=True,
-            on_click=_set_story_prompt,
-            args=(item["content"][:700], "history", "History item loaded into storyboard prompt."),
-        )
-        if btn_c.button("Remove", key=f"hist_remove_{index}", use_container_width=True):
-            st.session_state["ifs_history"].pop(index)
-            st.session_state["ifs_status_line"] = "History item removed."
-            _rerun()
+    btn_a, btn_b, btn_c = st.columns(3)
+    btn_a.button(
+        "Copy to Script Premise",
+        key="hist_script",
+        use_container_width=True,
+        on_click=_set_state_value,
+        args=("ifs_script_prompt", item["content"][:700], "History item loaded into script premise."),
+    )
+    btn_b.button(
+        "Copy to Storyboard Input",
+        key="hist_story",
+        use_container_width=True,
+        on_click=_set_story_prompt,
+        args=(item["content"][:700], "history", "History item loaded into storyboard prompt."),
+    )
+    btn_c.button(
+        "Remove",
+        key="hist_remove",
+        use_container_width=True,
+        on_click=_remove_history_item,
+        args=(item_id,),
+    )
 
 
 def main() -> None: